@@ -0,0 +1,3 @@
+from .simulator import SensorSimulator
+
+__all__ = ["SensorSimulator"]
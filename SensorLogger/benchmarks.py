@@ -0,0 +1,223 @@
+import gc
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from threading import Thread
+import numpy as np
+from .simulator import SensorSimulator
+from .sinks import FORMATS, HAS_ARROW, make_sink
+from .storage import ColumnStore
+from .decimate import M4Decimator, bucket_size_for
+
+
+# Benchmarks run by default; the soak run is opt-in because it is long.
+SUITE = ("generation", "memory", "export", "frame")
+BASE_NS = 1_700_000_000_000_000_000
+
+
+def bench_generation(samples=2_000_000, batch=100_000, singles=2_000, schema=None,
+                     capacity=None, seed=0):
+    # Batched generation as the acquisition loop does it, and one sample at
+    # a time through generate_data() as the original GUI did.
+    sim = SensorSimulator(sinks=[], capacity=capacity, seed=seed, schema=schema, fault_log=None)
+    sim.generate_batch(min(batch, samples))
+    done = 0
+    started = time.perf_counter()
+    while done < samples:
+        n = min(batch, samples - done)
+        sim.generate_batch(n)
+        done += n
+    batched = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(singles):
+        sim.generate_data()
+    single = time.perf_counter() - started
+    return {"channels": len(sim.schema), "samples": samples, "batch": batch,
+            "samples_per_s": samples / batched, "generate_data_per_s": singles / single}
+
+
+def bench_memory(samples=1_000_000, batch=100_000, schema=None):
+    # Python and NumPy allocations (tracemalloc sees both) of a simulator
+    # holding `samples` rows in memory, scaled to a million samples.
+    gc.collect()
+    tracemalloc.start()
+    try:
+        sim = SensorSimulator(sinks=[], capacity=samples, seed=0, schema=schema, fault_log=None)
+        for at in range(0, samples, batch):
+            sim.generate_batch(min(batch, samples - at))
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    scale = 1_000_000 / samples
+    return {"channels": len(sim.schema), "samples": samples,
+            "row_bytes": sim.data.dtype.itemsize,
+            "bytes_per_million": current * scale, "peak_bytes_per_million": peak * scale}
+
+
+def bench_export(lengths=(10_000, 100_000, 1_000_000), formats=None, schema=None):
+    # Time for export_data() to write a history of each length in each
+    # format. Sinks are not started, so everything is written at export.
+    if formats is None:
+        formats = [fmt for fmt in sorted(FORMATS) if HAS_ARROW or fmt not in ("parquet", "arrow")]
+    # A small untimed round first, so imports are not charged to a format.
+    _export(1_000, formats, schema)
+    return [result for length in lengths for result in _export(length, formats, schema)]
+
+
+def bench_frame(frames=300, window=10_000, batch=100, schema=None):
+    # The plot half of SensorGUI.update_ui (window ring, M4 decimation,
+    # blitted line update) on an offscreen Agg canvas.
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from .plotting import LivePlot
+    sim = SensorSimulator(sinks=[], seed=0, schema=schema, fault_log=None)
+    names = sim.schema.names[:2]
+    fig = Figure(figsize=(6, 4))
+    FigureCanvasAgg(fig)
+    plot = LivePlot(fig, fig.subplots(len(names), 1, squeeze=False)[:, 0], names,
+                    ("red", "blue"))
+    store = ColumnStore([("x", np.float64)] + [(name, np.float64) for name in names],
+                        capacity=window)
+    size = bucket_size_for(window, plot.pixel_width())
+    decimators = {name: M4Decimator(size, window) for name in names}
+    period = 1_000_000
+    # Frames are timed once the window is full, as in a running GUI.
+    warmup = -(-window // batch) + 10
+    times = []
+    for frame in range(frames + warmup):
+        timestamps = BASE_NS + (frame * batch + np.arange(batch, dtype=np.int64)) * period
+        block = sim.generate_batch(batch, timestamps)
+        started = time.perf_counter()
+        columns = sim.schema.select(block, names)
+        columns["x"] = (block["timestamp"] - BASE_NS) / 1e9
+        del columns["timestamp"]
+        store.extend(columns)
+        for name in names:
+            decimators[name].update(columns["x"], columns[name])
+        plot.update([decimators[name].points() for name in names])
+        if frame >= warmup:
+            times.append(time.perf_counter() - started)
+    times = np.array(times) * 1e3
+    return {"frames": frames, "window": window, "batch": batch,
+            "frame_ms_mean": float(times.mean()), "frame_ms_p50": float(np.percentile(times, 50)),
+            "frame_ms_p99": float(np.percentile(times, 99)), "full_redraws": plot.rescales}
+
+
+def soak(seconds=600.0, rate_hz=10_000, interval=10.0, capacity=100_000, formats=None,
+         schema=None):
+    # The real acquisition loop with streaming sinks and the fault log,
+    # sampling resident memory every `interval` seconds. Growth is reported
+    # over the whole run and, as a slope, over its second half, after the
+    # ring and the sinks' buffers have reached their steady size.
+    formats = formats or ["parquet" if HAS_ARROW else "csv"]
+    with tempfile.TemporaryDirectory() as tmp:
+        sim = SensorSimulator(sinks=[], capacity=capacity, seed=0, schema=schema,
+                              rate_hz=rate_hz, report_dir=tmp)
+        sim.sinks = [make_sink(sim.data, fmt, os.path.join(tmp, "log"), schema=sim.schema)
+                     for fmt in formats]
+        thread = Thread(target=sim.start_logging, daemon=True)
+        started = time.monotonic()
+        thread.start()
+        points = []
+        while True:
+            elapsed = time.monotonic() - started
+            points.append((elapsed, sim.data.total, rss_bytes()))
+            if elapsed >= seconds:
+                break
+            time.sleep(min(interval, seconds - elapsed))
+        sim.stop_logging()
+        thread.join()
+        sim.export_data()
+        for sink in sim.sinks:
+            sink.close()
+        sim.faults.close()
+    elapsed, samples, rss = (np.array(column, dtype=np.float64) for column in zip(*points))
+    late = elapsed >= elapsed[-1] / 2
+    slope = np.polyfit(elapsed[late], rss[late], 1)[0] if late.sum() > 1 else 0.0
+    return {"seconds": float(elapsed[-1]), "rate_hz": rate_hz, "samples": int(samples[-1]),
+            "faults": sim.faults.total, "rss_start": int(rss[0]), "rss_end": int(rss[-1]),
+            "rss_peak": int(rss.max()), "growth_bytes": int(rss[-1] - rss[0]),
+            "steady_growth_bytes_per_hour": float(slope * 3600),
+            "trace": [{"seconds": t, "samples": int(n), "rss": int(m)}
+                      for t, n, m in zip(elapsed.tolist(), samples.tolist(), rss.tolist())]}
+
+
+BENCHMARKS = {
+    "generation": bench_generation,
+    "memory": bench_memory,
+    "export": bench_export,
+    "frame": bench_frame,
+    "soak": soak,
+}
+
+
+def run_suite(names=SUITE, options=None):
+    # `options` maps a benchmark name to its keyword arguments.
+    options = options or {}
+    return {name: BENCHMARKS[name](**options.get(name, {})) for name in names}
+
+
+def environment():
+    # Enough to tell runs of different versions and machines apart.
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": commit, "python": platform.python_version(), "numpy": np.__version__,
+            "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def write_results(path, results):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+
+
+def rss_bytes():
+    # Current resident set size; peak RSS where /proc is not available.
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if platform.system() == "Darwin" else peak * 1024
+
+
+def _export(length, formats, schema):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        sim = SensorSimulator(sinks=[], capacity=length, seed=0, schema=schema,
+                              report_dir=tmp, fault_log=None)
+        sinks = {fmt: make_sink(sim.data, fmt, os.path.join(tmp, "log"), schema=sim.schema)
+                 for fmt in formats}
+        _fill(sim, length)
+        for fmt, sink in sinks.items():
+            sim.sinks = [sink]
+            started = time.perf_counter()
+            sim.export_data()
+            elapsed = time.perf_counter() - started
+            sink.close()
+            results.append({"format": fmt, "rows": length, "seconds": elapsed,
+                            "rows_per_s": length / elapsed, "bytes": _size(sink.path)})
+    return results
+
+
+def _fill(sim, rows, batch=100_000):
+    for at in range(0, rows, batch):
+        n = min(batch, rows - at)
+        sim.generate_batch(n, BASE_NS + (at + np.arange(n, dtype=np.int64)) * 1_000_000)
+
+
+def _size(path):
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
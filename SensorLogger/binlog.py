@@ -0,0 +1,219 @@
+import json
+import os
+import struct
+import zlib
+import numpy as np
+from .storage import time_slice
+
+
+MAGIC = b"SLOG0001"
+INDEX_MAGIC = b"SLOGIDX1"
+VERSION = 1
+# magic, version, header size, channels, block rows, record size
+HEADER = struct.Struct("<8sIIIII")
+# index magic, block count, index offset
+TRAILER = struct.Struct("<8sQQ")
+
+BLOCK_HEADER = np.dtype([
+    ("min_ts", "<i8"),
+    ("max_ts", "<i8"),
+    ("count", "<u4"),
+    ("crc", "<u4"),
+    ("reserved", "<u8"),
+])
+INDEX_ENTRY = np.dtype([("min_ts", "<i8"), ("max_ts", "<i8"), ("count", "<i8")])
+
+
+def record_dtype(channels):
+    # Aligned so the value matrix of a memory-mapped block is a plain view.
+    return np.dtype([
+        ("timestamp", "<i8"),
+        ("monotonic", "<i8"),
+        ("values", "<f8", (channels,)),
+        ("status", "u1"),
+        ("faults", "u1"),
+    ], align=True)
+
+
+class BinaryLogWriter:
+    # Append-only. Records go into the current block as they arrive and its
+    # header (range, count, running CRC) is rewritten after each write, so
+    # a reader or a crash only ever sees whole records. close() appends the
+    # block index; reopening an existing log strips it and carries on.
+    def __init__(self, path, schema, block_rows=65_536):
+        self.path = path
+        self.channels = len(schema)
+        self.record = record_dtype(self.channels)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            log = BinaryLog(path)
+            try:
+                if log.channels != self.channels:
+                    raise ValueError(f"{path} holds {log.channels} channels, not {self.channels}")
+                self.block_rows, self.header_size = log.block_rows, log.header_size
+                self._index = [list(entry) for entry in log.index.tolist()]
+                self._crc = int(log.block_header(len(self._index) - 1)["crc"]) if self._index else 0
+            finally:
+                log.close()
+            self._file = open(path, "r+b")
+        else:
+            self.block_rows = block_rows
+            meta = json.dumps({"names": list(schema.names), "labels": list(schema.labels),
+                               "units": list(schema.units)}).encode()
+            self.header_size = -(-(HEADER.size + len(meta)) // 8) * 8
+            self._file = open(path, "w+b")
+            self._file.write(HEADER.pack(MAGIC, VERSION, self.header_size, self.channels,
+                                         block_rows, self.record.itemsize))
+            self._file.write(meta.ljust(self.header_size - HEADER.size, b"\0"))
+            self._index, self._crc = [], 0
+        self.block_bytes = BLOCK_HEADER.itemsize + self.block_rows * self.record.itemsize
+        self._file.truncate(self._data_end())
+        self.rows = sum(count for _, _, count in self._index)
+
+    def _data_end(self):
+        if not self._index:
+            return self.header_size
+        last = len(self._index) - 1
+        return (self.header_size + last * self.block_bytes + BLOCK_HEADER.itemsize
+                + self._index[last][2] * self.record.itemsize)
+
+    def write(self, block):
+        n = len(block["timestamp"])
+        if not n:
+            return
+        rows = np.empty(n, self.record)
+        rows["timestamp"] = block["timestamp"]
+        rows["monotonic"] = block["monotonic"]
+        rows["values"] = block["values"]
+        rows["status"] = block["status"]
+        rows["faults"] = block.get("faults", 0)
+        done = 0
+        while done < n:
+            if not self._index or self._index[-1][2] == self.block_rows:
+                self._index.append([0, 0, 0])
+                self._crc = 0
+            entry = self._index[-1]
+            take = min(n - done, self.block_rows - entry[2])
+            chunk = rows[done:done + take]
+            data = chunk.tobytes()
+            offset = self.header_size + (len(self._index) - 1) * self.block_bytes
+            self._file.seek(offset + BLOCK_HEADER.itemsize + entry[2] * self.record.itemsize)
+            self._file.write(data)
+
+            ts = chunk["timestamp"]
+            low, high = int(ts.min()), int(ts.max())
+            entry[0] = low if not entry[2] else min(entry[0], low)
+            entry[1] = high if not entry[2] else max(entry[1], high)
+            entry[2] += take
+            self._crc = zlib.crc32(data, self._crc)
+            self._file.seek(offset)
+            self._file.write(np.array([(*entry, self._crc, 0)], BLOCK_HEADER).tobytes())
+            done += take
+        self.rows += n
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if self._file is None:
+            return
+        end = self._data_end()
+        self._file.seek(end)
+        self._file.write(np.array([tuple(entry) for entry in self._index], INDEX_ENTRY).tobytes())
+        self._file.write(TRAILER.pack(INDEX_MAGIC, len(self._index), end))
+        self._file.truncate()
+        self._file.close()
+        self._file = None
+
+
+class BinaryLog:
+    # Read side. The whole file is memory-mapped; blocks come back as NumPy
+    # views and a time range is located by binary search over the block
+    # index, then over the timestamps of the first and last block.
+    # Timestamps are expected to be non-decreasing through the file.
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, self.header_size, self.channels, self.block_rows, record_size = (
+                HEADER.unpack(f.read(HEADER.size)))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a binary sensor log")
+            meta = f.read(self.header_size - HEADER.size).rstrip(b"\0")
+        self.meta = json.loads(meta) if meta else {}
+        self.record = record_dtype(self.channels)
+        if record_size != self.record.itemsize:
+            raise ValueError(f"{path} has an unexpected record size")
+        self.block_bytes = BLOCK_HEADER.itemsize + self.block_rows * self.record.itemsize
+        self._mm = np.memmap(path, np.uint8, mode="r")
+        self.index = self._read_index()
+        self._starts = np.concatenate([[0], np.cumsum(self.index["count"])])
+
+    def _read_index(self):
+        size = len(self._mm)
+        if size >= self.header_size + TRAILER.size:
+            magic, blocks, end = TRAILER.unpack(self._mm[size - TRAILER.size:].tobytes())
+            if magic == INDEX_MAGIC:
+                return np.ndarray(blocks, INDEX_ENTRY, buffer=self._mm, offset=end).copy()
+        # No footer: the log is still being written or was not closed.
+        # Block headers sit at fixed offsets, so one strided view reads them.
+        blocks = max(0, (size - self.header_size - BLOCK_HEADER.itemsize) // self.block_bytes + 1)
+        headers = np.ndarray(blocks, BLOCK_HEADER, buffer=self._mm, offset=self.header_size,
+                             strides=(self.block_bytes,))
+        index = np.zeros(blocks, INDEX_ENTRY)
+        for name in INDEX_ENTRY.names:
+            index[name] = headers[name]
+        room = (size - self.header_size - np.arange(blocks) * self.block_bytes
+                - BLOCK_HEADER.itemsize) // self.record.itemsize
+        index["count"] = np.minimum(index["count"], room)
+        return index[index["count"] > 0]
+
+    def __len__(self):
+        return int(self._starts[-1])
+
+    def block_header(self, i):
+        return np.ndarray(1, BLOCK_HEADER, buffer=self._mm,
+                          offset=self.header_size + i * self.block_bytes)[0]
+
+    def records(self, i):
+        return np.ndarray(int(self.index["count"][i]), self.record, buffer=self._mm,
+                          offset=self.header_size + i * self.block_bytes + BLOCK_HEADER.itemsize)
+
+    def block(self, i, lo=0, hi=None):
+        rows = self.records(i)[lo:hi]
+        return {name: rows[name] for name in self.record.names}
+
+    def locate(self, start=None, end=None):
+        # Blocks whose time range overlaps [start, end], as a half-open range.
+        first = 0 if start is None else int(np.searchsorted(self.index["max_ts"], start, "left"))
+        last = (len(self.index) if end is None
+                else int(np.searchsorted(self.index["min_ts"], end, "right")))
+        return first, max(first, last)
+
+    def blocks(self, start=None, end=None, chunk_rows=None):
+        first, last = self.locate(start, end)
+        for i in range(first, last):
+            rows = time_slice(self.records(i)["timestamp"], start, end)
+            step = chunk_rows or max(rows.stop - rows.start, 1)
+            for at in range(rows.start, rows.stop, step):
+                yield self.block(i, at, min(at + step, rows.stop))
+
+    def range(self, start=None, end=None):
+        # Zero-copy when the range sits inside one block, copied otherwise.
+        parts = list(self.blocks(start, end))
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return {name: np.zeros((0,) + self.record[name].shape, self.record[name].base)
+                    for name in self.record.names}
+        return {name: np.concatenate([part[name] for part in parts])
+                for name in self.record.names}
+
+    def verify(self):
+        # Blocks whose records no longer match their CRC.
+        bad = []
+        for i in range(len(self.index)):
+            if zlib.crc32(self.records(i).tobytes()) != int(self.block_header(i)["crc"]):
+                bad.append(i)
+        return bad
+
+    def close(self):
+        self._mm = None
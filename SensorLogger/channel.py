@@ -0,0 +1,93 @@
+from collections import deque
+from threading import Condition
+import numpy as np
+
+
+POLICIES = ("block", "drop_oldest", "coalesce")
+
+
+class SampleChannel:
+    # Single producer, single consumer. deque.append/pop/popleft are atomic,
+    # so neither side takes a lock on the fast path; only a producer
+    # blocked on a full queue under the "block" policy waits on a condition.
+    def __init__(self, capacity=256, policy="drop_oldest"):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}")
+        self.capacity = capacity
+        self.policy = policy
+        self.seq = 0
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.received = 0
+        self.missed = 0
+        self.max_depth = 0
+        self._expected = 0
+        self._queue = deque()
+        self._space = Condition()
+
+    def __len__(self):
+        return len(self._queue)
+
+    def put(self, block, timeout=None):
+        count = len(block["timestamp"])
+        item = (self.seq, block)
+        self.seq += count
+        self.sent += count
+
+        if len(self._queue) >= self.capacity:
+            if self.policy == "block":
+                with self._space:
+                    if not self._space.wait_for(
+                            lambda: len(self._queue) < self.capacity, timeout):
+                        self.dropped += count
+                        return False
+            elif self.policy == "drop_oldest":
+                try:
+                    _, old = self._queue.popleft()
+                    self.dropped += len(old["timestamp"])
+                except IndexError:
+                    pass
+            else:
+                try:
+                    seq, newest = self._queue.pop()
+                    item = (seq, {name: np.concatenate([newest[name], block[name]])
+                                  for name in block})
+                    self.coalesced += 1
+                except IndexError:
+                    pass
+
+        self._queue.append(item)
+        self.max_depth = max(self.max_depth, len(self._queue))
+        return True
+
+    def drain(self):
+        items = []
+        while True:
+            try:
+                items.append(self._queue.popleft())
+            except IndexError:
+                break
+        if items and self.policy == "block":
+            with self._space:
+                self._space.notify()
+
+        # Sequence numbers count samples, so a gap means dropped batches.
+        for seq, block in items:
+            self.missed += seq - self._expected
+            self._expected = seq + len(block["timestamp"])
+            self.received += len(block["timestamp"])
+        return items
+
+    def stats(self):
+        return {
+            "depth": len(self._queue),
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "received": self.received,
+            "dropped": self.dropped,
+            "missed": self.missed,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,299 @@
+import argparse
+import os
+import sys
+import time
+from threading import Thread
+from .simulator import SensorSimulator
+from .sinks import DEFAULT_FORMAT, FORMATS, make_sink, read_blocks, parse_time
+from .faultlog import DEFAULT_FAULT_LOG, FAULT_LOG_FORMATS, COMPRESSIONS, make_fault_log
+
+
+def build_simulator(args, formats, **options):
+    base = os.path.join(args.reports, "sensor_data_log")
+    fault_log = None
+    if args.fault_log != "none":
+        fault_log = make_fault_log(
+            os.path.join(args.reports, "sensor_error_log"), args.fault_log,
+            max_bytes=None if args.fault_rotate_mb is None else int(args.fault_rotate_mb * 1e6),
+            max_age=args.fault_rotate_s, compression=args.fault_compress)
+    sim = SensorSimulator(sinks=[], report_dir=args.reports, schema=args.schema,
+                          trend_window=args.trend_window, fault_log=fault_log, **options)
+    sim.sinks = [make_sink(sim.data, fmt, base, schema=sim.schema) for fmt in formats]
+    return sim
+
+
+def finish(sim):
+    sim.export_data()
+    for sink in sim.sinks:
+        sink.close()
+    sim.data.close()
+    sim.faults.close()
+
+
+def print_stats(sim, stream=sys.stderr):
+    timing = sim.scheduler.stats()
+    print(f"samples={sim.data.total} "
+          f"rate={timing['achieved_hz']:.1f}/{timing['target_hz']:g} Hz "
+          f"jitter p50/p99={timing['jitter_p50_us']:.0f}/{timing['jitter_p99_us']:.0f} us "
+          f"overruns={timing['overruns']} faults={sim.faults.total}", file=stream)
+
+
+def print_trends(sim, stream=sys.stderr, limit=8):
+    rolling = sim.rolling
+    mean, std, rate, trend = rolling.mean(), rolling.std(), rolling.rate(), rolling.trend()
+    for i, channel in enumerate(sim.schema.channels[:limit]):
+        print(f"  {channel.name}: {mean[i]:.2f} ± {std[i]:.2f} {channel.units} "
+              f"{trend[i]} {rate[i]:+.3f}/s", file=stream)
+
+
+def run(args):
+    sim = build_simulator(args, args.format or [DEFAULT_FORMAT], capacity=args.capacity,
+                          spill_path=args.spill, seed=args.seed, rate_hz=args.rate,
+                          policy=args.policy, shared=args.shared)
+    thread = Thread(target=sim.start_logging, daemon=True)
+    thread.start()
+    deadline = None if args.duration is None else time.monotonic() + args.duration
+    try:
+        while deadline is None or time.monotonic() < deadline:
+            remaining = args.stats_every if deadline is None else min(
+                args.stats_every, deadline - time.monotonic())
+            time.sleep(max(remaining, 0))
+            print_stats(sim)
+            print_trends(sim)
+    except KeyboardInterrupt:
+        pass
+    sim.stop_logging()
+    thread.join()
+    finish(sim)
+    print_stats(sim)
+    print_trends(sim)
+    if args.shared and args.unlink:
+        sim.data.unlink()
+    return 0
+
+
+def replay(args):
+    formats = args.format or [DEFAULT_FORMAT]
+    base = os.path.join(args.reports, "sensor_data_log")
+    for fmt in formats:
+        # Sinks truncate their output when they open it.
+        if os.path.realpath(base + FORMATS[fmt][1]) == os.path.realpath(args.path):
+            args.parser.error(f"{args.path} would be overwritten by the {fmt} output; "
+                              "pick another --reports directory")
+    sim = build_simulator(args, formats)
+    bounds = [None, None]
+    if args.start or args.end:
+        head = next(read_blocks(args.path, 1, sim.schema), None)
+        day = None if head is None else head["timestamp"][0]
+        try:
+            bounds = [None if text is None else parse_time(text, day)
+                      for text in (args.start, args.end)]
+        except ValueError as error:
+            args.parser.error(f"bad --start/--end time: {error}")
+    start = first = None
+    for block in read_blocks(args.path, args.chunk_rows, sim.schema, *bounds):
+        if not len(block["timestamp"]):
+            continue
+        if args.speed > 0:
+            # Pace each chunk on its first timestamp relative to the recording start.
+            if first is None:
+                start, first = time.monotonic(), int(block["timestamp"][0])
+            due = start + (int(block["timestamp"][0]) - first) / 1e9 / args.speed
+            time.sleep(max(0.0, due - time.monotonic()))
+        sim.process(block["timestamp"], block["values"], block.get("monotonic"))
+        # Archive each chunk before later ones can push it out of the ring.
+        for sink in sim.sinks:
+            sink.flush()
+    finish(sim)
+    print(f"replayed {sim.data.total} samples, {sim.faults.total} faults", file=sys.stderr)
+    print_trends(sim)
+    lost = [sink for sink in sim.sinks if sink.lost]
+    for sink in lost:
+        print(f"{sink.path}: {sink.lost} rows lost", file=sys.stderr)
+    return 1 if lost else 0
+
+
+def export(args):
+    args.speed = 0
+    args.format = [args.to]
+    return replay(args)
+
+
+def bench(args):
+    from .benchmarks import SUITE, run_suite, write_results
+    names = list(args.only or SUITE) + (["soak"] if args.soak else [])
+    schema = {"schema": args.schema}
+    options = {
+        "generation": dict(schema, samples=args.samples, batch=args.batch,
+                           capacity=args.capacity, seed=args.seed),
+        "memory": dict(schema, samples=min(args.samples, 1_000_000)),
+        "export": dict(schema, lengths=args.lengths, formats=args.format),
+        "frame": dict(schema, frames=args.frames, window=args.window),
+        "soak": dict(schema, seconds=args.soak or 0, rate_hz=args.rate, formats=args.format),
+    }
+    results = {}
+    for name in dict.fromkeys(names):
+        print(f"running {name}...", file=sys.stderr)
+        results.update(run_suite([name], options))
+    write_results(args.json, results)
+    if "generation" in results:
+        r = results["generation"]
+        print(f"generation: {r['samples_per_s']:,.0f} samples/s batched, "
+              f"{r['generate_data_per_s']:,.0f}/s via generate_data")
+    if "memory" in results:
+        print(f"memory: {results['memory']['bytes_per_million'] / 1e6:.1f} MB per million samples")
+    for r in results.get("export", []):
+        print(f"export {r['format']:>7} {r['rows']:>9} rows: {r['seconds']:.3f} s "
+              f"({r['rows_per_s']:,.0f} rows/s, {r['bytes'] / 1e6:.1f} MB)")
+    if "frame" in results:
+        r = results["frame"]
+        print(f"frame: {r['frame_ms_p50']:.2f} ms p50, {r['frame_ms_p99']:.2f} ms p99 "
+              f"({r['window']} point window)")
+    if "soak" in results:
+        r = results["soak"]
+        print(f"soak: {r['samples']} samples in {r['seconds']:.0f} s, RSS "
+              f"{r['rss_start'] / 1e6:.1f} -> {r['rss_end'] / 1e6:.1f} MB, steady growth "
+              f"{r['steady_growth_bytes_per_hour'] / 1e6:+.1f} MB/h")
+    print(f"results written to {args.json}", file=sys.stderr)
+    return 0
+
+
+def ingest(args):
+    import asyncio
+    from .engine import Engine, SocketSource, ArchiveTask, MetricsTask
+    sim = build_simulator(args, args.format or [DEFAULT_FORMAT])
+    source = SocketSource(len(sim.schema), args.host, args.port)
+    metrics = MetricsTask(interval=args.stats_every, status_labels=sim.faults.status_labels)
+    engine = Engine(sim, [source], [ArchiveTask(sink) for sink in sim.sinks] + [metrics])
+
+    async def serve():
+        loop = asyncio.get_running_loop()
+        if args.duration is not None:
+            loop.call_later(args.duration, engine.stop)
+        running = asyncio.create_task(engine.run())
+        await source.listening.wait()
+        print(f"listening on {args.host}:{source.port}", file=sys.stderr)
+        await running
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finish(sim)
+    print(f"ingested {sim.data.total} samples, {sim.faults.total} faults", file=sys.stderr)
+    return 0
+
+
+def fleet(args):
+    from .fleet import run_fleet
+    with run_fleet(args.stands, args.samples, workers=args.workers, seed=args.seed,
+                   schema=args.schema, rate_hz=args.rate, batch=args.batch) as result:
+        print(f"generated {len(result)} samples from {args.stands} stands in "
+              f"{result.elapsed:.3f} s ({result.rate():,.0f} samples/s)")
+        for label, count in zip(result.faults.status_labels, result.faults.status_counts.tolist()):
+            print(f" {label}: {count}")
+        for sensor, count in result.faults.counts.items():
+            print(f" - {sensor}: {count} occurrence(s)")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="sensor-logger",
+                                     description="Headless sensor acquisition and log tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--reports", default="reports", help="output directory")
+    common.add_argument("--schema", help="channel schema, .json or .yaml (default: built-in)")
+    common.add_argument("--trend-window", type=int, default=100,
+                        help="samples in the moving mean/volatility/trend window")
+    common.add_argument("--fault-log", choices=sorted(FAULT_LOG_FORMATS) + ["none"],
+                        default=DEFAULT_FAULT_LOG,
+                        help="fault log streamed to sensor_error_log.* (default: %(default)s)")
+    common.add_argument("--fault-rotate-mb", type=float, help="rotate the fault log at this size")
+    common.add_argument("--fault-rotate-s", type=float, help="rotate the fault log at this age")
+    common.add_argument("--fault-compress", choices=sorted(COMPRESSIONS),
+                        help="compress rotated fault log segments")
+
+    formats = sorted(FORMATS)
+    p = commands.add_parser("run", parents=[common], help="acquire samples without the GUI")
+    p.add_argument("--rate", type=float, default=1000.0, help="sample rate in Hz")
+    p.add_argument("--duration", type=float, help="seconds to run (default: until Ctrl-C)")
+    p.add_argument("--policy", choices=("catch_up", "skip"), default="catch_up")
+    p.add_argument("--format", action="append", choices=formats,
+                   help=f"archive format, repeatable (default: {DEFAULT_FORMAT})")
+    p.add_argument("--capacity", type=int,
+                   help="in-memory rows (default: about 3M readings' worth)")
+    p.add_argument("--spill", help="file for rows evicted from memory")
+    p.add_argument("--shared", metavar="NAME",
+                   help="keep rows in a named shared-memory ring for `python -m SensorLogger.main --attach NAME`")
+    p.add_argument("--unlink", action="store_true",
+                   help="remove the shared ring on exit instead of keeping it for a restart")
+    p.add_argument("--seed", type=int)
+    p.add_argument("--stats-every", type=float, default=5.0, help="seconds between stats lines")
+    p.set_defaults(func=run)
+
+    p = commands.add_parser("replay", parents=[common], help="feed a recorded log through the pipeline")
+    p.add_argument("path", help="recorded .csv, .parquet, .arrow, .sqlite, .slog or spill .bin")
+    p.add_argument("--speed", type=float, default=0.0,
+                   help="playback speed multiplier, 0 for as fast as possible")
+    p.add_argument("--start", help="skip to this time: HH:MM:SS, a date and time, or epoch ns")
+    p.add_argument("--end", help="stop after this time, same forms as --start")
+    p.add_argument("--format", action="append", choices=formats)
+    p.add_argument("--chunk-rows", type=int, default=100_000)
+    p.set_defaults(func=replay, parser=p)
+
+    p = commands.add_parser("export", parents=[common], help="convert a recorded log and rebuild its reports")
+    p.add_argument("path", help="recorded .csv, .parquet, .arrow, .sqlite, .slog or spill .bin")
+    p.add_argument("--to", choices=formats, default=DEFAULT_FORMAT)
+    p.add_argument("--start", help="first time to export: HH:MM:SS, a date and time, or epoch ns")
+    p.add_argument("--end", help="export rows up to this time, same forms as --start")
+    p.add_argument("--chunk-rows", type=int, default=100_000)
+    p.set_defaults(func=export, parser=p)
+
+    p = commands.add_parser("ingest", parents=[common], help="receive samples over TCP")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=7700)
+    p.add_argument("--duration", type=float, help="seconds to listen (default: until Ctrl-C)")
+    p.add_argument("--format", action="append", choices=formats)
+    p.add_argument("--stats-every", type=float, default=5.0, help="seconds between stats lines")
+    p.set_defaults(func=ingest)
+
+    p = commands.add_parser("bench", help="run the benchmark suite and write JSON results")
+    p.add_argument("--only", action="append", choices=("generation", "memory", "export", "frame"),
+                   help="benchmark to run, repeatable (default: all but soak)")
+    p.add_argument("--json", default="reports/benchmarks.json", help="results file")
+    p.add_argument("--schema", help="channel schema, .json or .yaml (default: built-in)")
+    p.add_argument("--samples", type=int, default=2_000_000, help="samples for generation")
+    p.add_argument("--batch", type=int, default=100_000, help="generation batch size")
+    p.add_argument("--capacity", type=int, help="in-memory rows during generation")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--lengths", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                   help="history lengths to export")
+    p.add_argument("--format", action="append", choices=formats,
+                   help="export/soak format, repeatable (default: all / the default format)")
+    p.add_argument("--frames", type=int, default=300)
+    p.add_argument("--window", type=int, default=10_000, help="plotted points per frame")
+    p.add_argument("--soak", type=float, metavar="SECONDS",
+                   help="also run a soak test this long and report memory growth")
+    p.add_argument("--rate", type=float, default=10_000.0, help="soak sample rate in Hz")
+    p.set_defaults(func=bench)
+
+    p = commands.add_parser("fleet", help="simulate many stands across a process pool")
+    p.add_argument("--stands", type=int, default=1000)
+    p.add_argument("--samples", type=int, default=10_000, help="samples per stand")
+    p.add_argument("--workers", type=int, help="processes (default: one per core)")
+    p.add_argument("--rate", type=float, default=1000.0, help="nominal sample rate per stand")
+    p.add_argument("--batch", type=int, default=10_000)
+    p.add_argument("--seed", type=int)
+    p.add_argument("--schema", help="channel schema, .json or .yaml (default: built-in)")
+    p.set_defaults(func=fleet)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import numpy as np
+from .storage import ColumnStore
+
+
+POINT_COLUMNS = [("x", np.float64), ("y", np.float64)]
+
+
+def m4_indices(y, size):
+    # For each row of `y` (one bucket) keep the first, min, max and last
+    # sample, in time order, so spikes survive any amount of reduction.
+    rows = y.shape[0]
+    missing = np.isnan(y)
+    idx = np.empty((rows, 4), dtype=np.int64)
+    idx[:, 0] = 0
+    idx[:, 1] = np.where(missing, np.inf, y).argmin(axis=1)
+    idx[:, 2] = np.where(missing, -np.inf, y).argmax(axis=1)
+    idx[:, 3] = size - 1
+    idx.sort(axis=1)
+    return idx + (np.arange(rows) * size)[:, None]
+
+
+def m4(x, y, buckets):
+    n = len(y)
+    if n <= 4 * buckets:
+        return x, y
+    size = -(-n // buckets)
+    full = n - n % size
+    idx = m4_indices(y[:full].reshape(-1, size), size).ravel()
+    if full < n:
+        tail = m4_indices(y[full:].reshape(1, -1), n - full).ravel() + full
+        idx = np.concatenate([idx, tail])
+    return x[idx], y[idx]
+
+
+def bucket_size_for(points, width):
+    size = -(-points // max(width, 1))
+    # Below five samples per bucket M4 keeps everything anyway.
+    return size if size > 4 else 1
+
+
+class M4Decimator:
+    # Buckets are aligned to the absolute sample count, so finished buckets
+    # never change: each update reduces only newly completed buckets and
+    # keeps the unfinished remainder raw.
+    def __init__(self, bucket_size, points):
+        self.bucket_size = bucket_size
+        buckets = -(-points // bucket_size) + 1
+        capacity = buckets if bucket_size == 1 else 4 * buckets
+        self.reduced = ColumnStore(POINT_COLUMNS, capacity=capacity)
+        self._x = np.zeros(0)
+        self._y = np.zeros(0)
+
+    def update(self, x, y):
+        if self.bucket_size == 1:
+            self.reduced.extend({"x": x, "y": y})
+            return
+        if len(self._x):
+            x = np.concatenate([self._x, x])
+            y = np.concatenate([self._y, y])
+        full = len(y) - len(y) % self.bucket_size
+        if full:
+            idx = m4_indices(y[:full].reshape(-1, self.bucket_size), self.bucket_size).ravel()
+            self.reduced.extend({"x": x[idx], "y": y[idx]})
+        self._x = np.array(x[full:])
+        self._y = np.array(y[full:])
+
+    def points(self):
+        if not len(self._x):
+            return self.reduced["x"], self.reduced["y"]
+        return (np.concatenate([self.reduced["x"], self._x]),
+                np.concatenate([self.reduced["y"], self._y]))
+
+
+def decimate_range(blocks, names, start, end, width):
+    # Two passes over the (possibly spilled) history: count the rows inside
+    # [start, end] per block, then give each block a share of `width`
+    # buckets proportional to its row count.
+    ranges = []
+    for block in blocks:
+        ts = block["timestamp"]
+        lo = 0 if start is None else np.searchsorted(ts, start, side="left")
+        hi = len(ts) if end is None else np.searchsorted(ts, end, side="right")
+        if hi > lo:
+            ranges.append((block, lo, hi))
+    total = sum(hi - lo for _, lo, hi in ranges)
+
+    parts = {name: ([], []) for name in names}
+    for block, lo, hi in ranges:
+        buckets = max(1, round(width * (hi - lo) / total))
+        ts = block["timestamp"][lo:hi]
+        for name in names:
+            x, y = m4(ts, block[name][lo:hi], buckets)
+            parts[name][0].append(np.asarray(x))
+            parts[name][1].append(np.asarray(y))
+
+    result = {}
+    for name, (xs, ys) in parts.items():
+        if xs:
+            result[name] = (np.concatenate(xs), np.concatenate(ys))
+        else:
+            result[name] = (np.zeros(0, dtype=np.int64), np.zeros(0))
+    return result
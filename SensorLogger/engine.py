@@ -0,0 +1,390 @@
+import asyncio
+import sys
+import time
+from threading import Thread
+import numpy as np
+from .sinks import read_blocks
+from .simulator import PAUSE_POLL
+
+
+class AsyncSource:
+    # Produces raw readings as {"timestamp": int64 epoch-ns, "values":
+    # (n, channels) float64} blocks, with an optional "monotonic" int64 ns
+    # column when the source knows its own clock; the engine checks,
+    # stores and fans them out to the sinks.
+    async def blocks(self):
+        raise NotImplementedError
+        yield
+
+
+class SimulatorSource(AsyncSource):
+    def __init__(self, sim):
+        self.sim = sim
+
+    async def blocks(self):
+        sim = self.sim
+        scheduler = sim.scheduler
+        scheduler.reset()
+        while sim.running.is_set():
+            delay = sim.next_delay()
+            await asyncio.sleep(PAUSE_POLL if delay is None else delay)
+            if delay is None:
+                continue
+            timestamps = scheduler.take()
+            yield {"timestamp": timestamps, "monotonic": scheduler.monotonic(timestamps),
+                   "values": sim.schema.generate(sim.rng, len(timestamps))}
+
+
+class ReplaySource(AsyncSource):
+    # Recorded logs are read lazily, chunk by chunk in a worker thread, so
+    # decoding a Parquet row group never stalls the loop and a multi-GB log
+    # starts playing at once. Playback follows the recorded timestamps at
+    # `speed` times real time (0 for as fast as possible), in slices of at
+    # most `tick` seconds so slow replays still update smoothly. seek() and
+    # `speed` may be changed while playing, from any thread.
+    def __init__(self, path, speed=0.0, chunk_rows=100_000, schema=None, tick=0.05,
+                 paused=None):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.schema = schema
+        self.tick = tick
+        self.paused = paused
+        self.position = None
+        self._speed = 0.0
+        self._anchor = None
+        self._seek = None
+        self.speed = speed
+
+    @property
+    def speed(self):
+        return self._speed
+
+    @speed.setter
+    def speed(self, value):
+        if value < 0:
+            raise ValueError("speed must be >= 0")
+        self._speed = float(value)
+        self._anchor = None
+
+    def seek(self, timestamp):
+        # Takes effect at the next slice; before blocks() starts, it sets
+        # where playback begins.
+        self._seek = int(timestamp)
+
+    def start_time(self):
+        block = next(read_blocks(self.path, 1, self.schema), None)
+        return None if block is None else int(block["timestamp"][0])
+
+    async def blocks(self):
+        while True:
+            start, self._seek, self._anchor = self._seek, None, None
+            reader = read_blocks(self.path, self.chunk_rows, self.schema, start)
+            try:
+                async for block in self._play(reader):
+                    yield block
+            finally:
+                reader.close()
+            if self._seek is None:
+                return
+
+    async def _play(self, reader):
+        while self._seek is None:
+            block = await asyncio.to_thread(next, reader, None)
+            if block is None:
+                return
+            timestamps = block["timestamp"]
+            at = 0
+            while at < len(timestamps):
+                if self._seek is not None:
+                    return
+                if self.paused is not None and self.paused():
+                    # Re-anchor on resume instead of catching up the paused time.
+                    self._anchor = None
+                    await asyncio.sleep(self.tick)
+                    continue
+                end = len(timestamps)
+                speed = self._speed
+                if speed > 0:
+                    if self._anchor is None:
+                        self._anchor = (time.monotonic(), int(timestamps[at]))
+                    wall, recorded = self._anchor
+                    span = int(self.tick * speed * 1e9)
+                    end = max(at + 1, int(np.searchsorted(
+                        timestamps, int(timestamps[at]) + span, "left")))
+                    due = wall + (int(timestamps[end - 1]) - recorded) / 1e9 / speed
+                    delay = due - time.monotonic()
+                    if delay > 0:
+                        # Short sleeps keep seek, pause and speed changes responsive.
+                        await asyncio.sleep(min(delay, self.tick))
+                        continue
+                self.position = int(timestamps[end - 1])
+                yield {name: block[name][at:end] for name in ("timestamp", "monotonic", "values")
+                       if name in block}
+                at = end
+
+
+class RingSource(AsyncSource):
+    # Follows a SharedColumnStore written by another process. Each new run
+    # of rows is copied out once and validated against the writer's claim,
+    # so rows overwritten mid-copy are re-read rather than delivered torn.
+    def __init__(self, ring, start=None, limit=10_000, poll=0.01, paused=None):
+        self.ring = ring
+        self.cursor = ring.first if start is None else start
+        self.limit = limit
+        self.poll = poll
+        self.paused = paused
+        self.lost = 0
+
+    async def blocks(self):
+        while True:
+            if self.ring.total <= self.cursor or (self.paused is not None and self.paused()):
+                await asyncio.sleep(self.poll)
+                continue
+            start, block = self.ring.read_since(self.cursor, self.limit, copy=True)
+            self.lost += start - self.cursor
+            self.cursor = start + len(block["timestamp"])
+            yield {"timestamp": block["timestamp"], "monotonic": block["monotonic"],
+                   "values": block["values"]}
+
+
+class SocketSource(AsyncSource):
+    # TCP ingestion. Clients stream little-endian records: an int64
+    # epoch-ns timestamp followed by one float64 per channel. A full queue
+    # stops reading from the sockets, so TCP flow control pushes back on
+    # senders instead of the engine buffering without bound.
+    def __init__(self, channels, host="127.0.0.1", port=0, max_blocks=64):
+        self.dtype = np.dtype([("timestamp", "<i8"), ("values", "<f8", (channels,))])
+        self.host = host
+        self.port = port
+        self.clients = 0
+        self.listening = asyncio.Event()
+        self._queue = asyncio.Queue(max_blocks)
+
+    async def blocks(self):
+        server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        self.listening.set()
+        try:
+            while True:
+                yield await self._queue.get()
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    async def _serve(self, reader, writer):
+        self.clients += 1
+        size = self.dtype.itemsize
+        pending = bytearray()
+        try:
+            while data := await reader.read(1 << 16):
+                pending += data
+                whole = len(pending) - len(pending) % size
+                if not whole:
+                    continue
+                rows = np.frombuffer(bytes(pending[:whole]), self.dtype)
+                del pending[:whole]
+                await self._queue.put({"timestamp": rows["timestamp"].astype(np.int64),
+                                       "values": rows["values"].astype(np.float64)})
+        finally:
+            self.clients -= 1
+            writer.close()
+
+
+class SinkTask:
+    # A consumer behind a bounded queue. When the queue is full the engine
+    # waits ("block", backpressure on every source) or the oldest queued
+    # block is discarded ("drop_oldest").
+    def __init__(self, name, maxsize=64, policy="block"):
+        if policy not in ("block", "drop_oldest"):
+            raise ValueError("policy must be 'block' or 'drop_oldest'")
+        self.name = name
+        self.policy = policy
+        self.queue = asyncio.Queue(maxsize)
+        self.handled = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.blocked = 0.0
+
+    async def put(self, block):
+        if self.policy == "drop_oldest" and self.queue.full():
+            self.dropped += len(self.queue.get_nowait()["timestamp"])
+        if self.queue.full():
+            started = time.perf_counter()
+            await self.queue.put(block)
+            self.blocked += time.perf_counter() - started
+        else:
+            self.queue.put_nowait(block)
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    async def run(self):
+        while True:
+            block = await self.queue.get()
+            if block is None:
+                break
+            await self.handle(block)
+            self.handled += len(block["timestamp"])
+        await self.close()
+
+    async def handle(self, block):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+    def stats(self):
+        return {
+            "depth": self.queue.qsize(),
+            "max_depth": self.max_depth,
+            "handled": self.handled,
+            "dropped": self.dropped,
+            "blocked_s": self.blocked,
+        }
+
+
+class ArchiveTask(SinkTask):
+    # Drives a StreamingSink from the loop instead of its own thread. The
+    # sink still reads rows from the store; file I/O runs in a worker thread.
+    def __init__(self, sink, maxsize=64):
+        super().__init__(type(sink).__name__, maxsize)
+        self.sink = sink
+        self._flushed = time.monotonic()
+
+    async def handle(self, block):
+        pending = self.sink.store.total - self.sink.cursor
+        due = time.monotonic() - self._flushed >= self.sink.flush_interval
+        if due or pending >= min(self.sink.batch_size, self.sink.store.capacity // 2):
+            await asyncio.to_thread(self.sink.flush)
+            self._flushed = time.monotonic()
+
+    async def close(self):
+        await asyncio.to_thread(self.sink.flush)
+
+
+class ChannelTask(SinkTask):
+    # Hands blocks to a SampleChannel for the Tk thread. The loop never
+    # waits on the UI: a full channel applies its own overflow policy.
+    def __init__(self, channel, maxsize=64):
+        super().__init__("channel", maxsize)
+        self.channel = channel
+
+    async def handle(self, block):
+        self.channel.put(block, timeout=0)
+
+
+class MetricsTask(SinkTask):
+    # Reports throughput and status counts every `interval` seconds.
+    def __init__(self, report=None, interval=5.0, status_labels=None, maxsize=64):
+        super().__init__("metrics", maxsize)
+        self.report = report or self.print_report
+        self.interval = interval
+        self.status_labels = status_labels
+        self._rows = 0
+        self._status = np.zeros(256, dtype=np.int64)
+        self._since = time.monotonic()
+
+    async def handle(self, block):
+        self._rows += len(block["timestamp"])
+        self._status += np.bincount(block["status"], minlength=256)
+        now = time.monotonic()
+        if now - self._since >= self.interval:
+            self.report(self.snapshot(now))
+            self._rows = 0
+            self._status[:] = 0
+            self._since = now
+
+    def snapshot(self, now=None):
+        elapsed = (now or time.monotonic()) - self._since
+        status = self._status
+        if self.status_labels is not None:
+            status = dict(zip(self.status_labels, status.tolist()))
+        return {"rows": self._rows, "rate_hz": self._rows / elapsed if elapsed > 0 else 0.0,
+                "status": status}
+
+    @staticmethod
+    def print_report(metrics):
+        print(f"rate={metrics['rate_hz']:.1f} Hz rows={metrics['rows']}", file=sys.stderr)
+
+
+class Engine:
+    # Every source is pumped by its own task into SensorSimulator.process;
+    # each processed block is then offered to every sink queue in turn.
+    def __init__(self, sim, sources, sinks=()):
+        self.sim = sim
+        self.sources = list(sources)
+        self.sinks = list(sinks)
+        self.loop = None
+        self._pumps = []
+        self._stopping = False
+
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        self.sim.running.set()
+        consumers = [asyncio.create_task(sink.run()) for sink in self.sinks]
+        self._pumps = [asyncio.create_task(self._pump(source)) for source in self.sources]
+        if self._stopping:
+            self._cancel()
+        try:
+            # One failing source stops the others, and so does a failing
+            # sink, whose full queue would otherwise block every pump.
+            pending = set(self._pumps + consumers)
+            while not all(pump.done() for pump in self._pumps):
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if any(_failed(task) for task in done):
+                    break
+            self._cancel()
+            if self._pumps:
+                await asyncio.wait(self._pumps)
+        finally:
+            self.sim.running.clear()
+            for sink, consumer in zip(self.sinks, consumers):
+                if not consumer.done():
+                    await sink.queue.put(None)
+            await asyncio.gather(*consumers, return_exceptions=True)
+        for task in self._pumps + consumers:
+            if _failed(task):
+                raise task.exception()
+
+    async def _pump(self, source):
+        async for block in source.blocks():
+            processed = self.sim.process(block["timestamp"], block["values"],
+                                         block.get("monotonic"))
+            for sink in self.sinks:
+                await sink.put(processed)
+
+    def stop(self):
+        # Safe from any thread; sources are cancelled, sinks drain.
+        self._stopping = True
+        if self.loop is not None and not self.loop.is_closed():
+            try:
+                self.loop.call_soon_threadsafe(self._cancel)
+            except RuntimeError:
+                pass  # the run finished meanwhile
+
+    def _cancel(self):
+        for pump in self._pumps:
+            pump.cancel()
+
+    def stats(self):
+        return {sink.name: sink.stats() for sink in self.sinks}
+
+
+def _failed(task):
+    return task.done() and not task.cancelled() and task.exception() is not None
+
+
+class EngineThread(Thread):
+    # Runs an engine's loop beside a Tk mainloop. Tk never awaits anything:
+    # it polls the SampleChannel and calls stop(), which only schedules.
+    def __init__(self, engine):
+        super().__init__(daemon=True)
+        self.engine = engine
+        self.error = None
+
+    def run(self):
+        try:
+            asyncio.run(self.engine.run())
+        except Exception as exc:
+            self.error = exc
+
+    def stop(self):
+        self.engine.stop()
@@ -0,0 +1,259 @@
+import gzip
+import json
+import math
+import os
+import struct
+import time
+from threading import Thread, Event, Lock
+import numpy as np
+from .sinks import HAS_ARROW, format_time, from_local
+
+
+DEFAULT_FAULT_LOG = "jsonl"
+FAULT_LOG_FORMATS = {"jsonl": ".jsonl", "flog": ".flog"}
+COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+# Compact binary event log: a magic line, then records of a fixed header
+# (kind, epoch-ns timestamp, sensor id, payload length) and a payload. A
+# sensor's name is written once per segment before its first event, so
+# events carry a 2-byte id; numeric issues are a float64, others UTF-8.
+MAGIC = b"SLFLOG1\n"
+RECORD = struct.Struct("<BqHH")
+SENSOR, TEXT, NUMBER = 0, 1, 2
+
+
+class FaultLog:
+    # Fault entries (timestamp, sensor, issue) streamed to disk by a
+    # background thread as JSON Lines or the binary format above, chosen by
+    # the path's extension. write() only queues; the thread writes and
+    # flushes at least every `flush_interval` seconds (sooner once
+    # `batch_size` entries are waiting), so a crash loses at most that much.
+    # The active file is rotated once it holds `max_bytes` or is `max_age`
+    # seconds old: it is renamed after its start time and, with
+    # `compression` ("gzip" or "zstd"), compressed off the writer thread.
+    def __init__(self, path, flush_interval=1.0, batch_size=10_000, max_bytes=None,
+                 max_age=None, compression=None, fsync=False):
+        root, ext = os.path.splitext(path)
+        formats = {ext: fmt for fmt, ext in FAULT_LOG_FORMATS.items()}
+        if ext not in formats:
+            raise ValueError(f"fault log must end in one of {tuple(formats)}: {path}")
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(f"compression must be one of {tuple(COMPRESSIONS)}")
+        if compression == "zstd" and not HAS_ARROW:
+            raise ImportError("zstd compression requires pyarrow")
+        self.path = path
+        self.format = formats[ext]
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compression = compression
+        self.fsync = fsync
+        self.written = 0
+        self.segments = []
+        self._root, self._ext = root, ext
+        self._pending = []
+        self._file = None
+        self._opened_at = 0.0
+        self._sensors = {}
+        self._lock = Lock()
+        self._io = Lock()
+        self._wake = Event()
+        self._stop = Event()
+        self._thread = None
+        self._compressors = []
+        self._closed = False
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, entries):
+        with self._lock:
+            self._pending.extend(entries)
+            pending = len(self._pending)
+        if self._thread is None:
+            self.start()
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def notify(self, force=False):
+        if force or len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    def flush(self):
+        with self._lock:
+            entries, self._pending = self._pending, []
+        with self._io:
+            if self._file is None:
+                self._open()
+            elif self._due():
+                self._rotate()
+            # Written in slices so a rotation can fall inside a large flush.
+            for at in range(0, len(entries), 1024):
+                chunk = entries[at:at + 1024]
+                self._file.write(self._encode(chunk))
+                self.written += len(chunk)
+                if self._due():
+                    self._sync()
+                    self._rotate()
+            self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        with self._io:
+            self._file.close()
+            self._file = None
+        for thread in self._compressors:
+            thread.join()
+        self._compressors = []
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if os.path.exists(self.path) and os.path.getsize(self.path):
+            # Left behind by an earlier run, possibly one that crashed.
+            self._retire(os.path.getmtime(self.path))
+        self._file = open(self.path, "wb")
+        self._opened_at = time.time()
+        self._sensors = {}
+        if self.format == "flog":
+            self._file.write(MAGIC)
+
+    def _due(self):
+        size = self._file.tell()
+        if size <= (len(MAGIC) if self.format == "flog" else 0):
+            return False
+        return ((self.max_bytes is not None and size >= self.max_bytes)
+                or (self.max_age is not None and time.time() - self._opened_at >= self.max_age))
+
+    def _rotate(self):
+        self._file.close()
+        self._retire(self._opened_at)
+        self._open()
+
+    def _retire(self, started):
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(started))
+        target, n = f"{self._root}.{stamp}{self._ext}", 1
+        while any(os.path.exists(target + suffix) for suffix in ("", *COMPRESSIONS.values())):
+            target, n = f"{self._root}.{stamp}-{n:03d}{self._ext}", n + 1
+        os.replace(self.path, target)
+        if self.compression is None:
+            self.segments.append(target)
+            return
+        self.segments.append(target + COMPRESSIONS[self.compression])
+        thread = Thread(target=_compress, args=(target, self.compression), daemon=True)
+        thread.start()
+        self._compressors = [t for t in self._compressors if t.is_alive()] + [thread]
+
+    def _encode(self, entries):
+        times, sensors, issues = zip(*entries)
+        if self.format == "jsonl":
+            # Same text as json.dumps per entry, with sensor names encoded
+            # once and finite floats written as their repr.
+            text = format_time(np.array(times, dtype=np.int64), "us", date=True).tolist()
+            names = {sensor: json.dumps(sensor) for sensor in set(sensors)}
+            return "".join(
+                f'{{"Time": "{t}", "Sensor": {names[s]}, "Issue": '
+                f'{repr(i) if type(i) is float and math.isfinite(i) else json.dumps(i)}}}\n'
+                for t, s, i in zip(text, sensors, issues)).encode()
+        out = bytearray()
+        pack = RECORD.pack
+        for t, sensor, issue in zip(times, sensors, issues):
+            sid = self._sensors.get(sensor)
+            if sid is None:
+                sid = self._sensors[sensor] = len(self._sensors)
+                name = sensor.encode()
+                out += pack(SENSOR, 0, sid, len(name)) + name
+            if isinstance(issue, float):
+                out += pack(NUMBER, t, sid, 8) + struct.pack("<d", issue)
+            else:
+                text = str(issue).encode()
+                out += pack(TEXT, t, sid, len(text)) + text
+        return bytes(out)
+
+
+def make_fault_log(base, fmt=DEFAULT_FAULT_LOG, **options):
+    return FaultLog(base + FAULT_LOG_FORMATS[fmt], **options)
+
+
+def read_fault_log(path):
+    # Entries of one segment as (epoch-ns timestamp, sensor, issue) tuples;
+    # rotated segments may be gzip or zstd compressed.
+    data = _read_bytes(path)
+    name = path.rsplit(".", 1)[0] if path.endswith(tuple(COMPRESSIONS.values())) else path
+    if name.endswith(".jsonl"):
+        rows = [json.loads(line) for line in data.decode().splitlines() if line]
+        if not rows:
+            return []
+        times = np.array([row["Time"] for row in rows], dtype="datetime64[ns]").astype(np.int64)
+        return [(t, row["Sensor"], row["Issue"])
+                for t, row in zip(from_local(times).tolist(), rows)]
+    if not data.startswith(MAGIC):
+        raise ValueError(f"not a binary fault log: {path}")
+    entries, sensors = [], {}
+    at = len(MAGIC)
+    while at + RECORD.size <= len(data):
+        kind, t, sid, size = RECORD.unpack_from(data, at)
+        at += RECORD.size
+        payload = data[at:at + size]
+        at += size
+        if kind == SENSOR:
+            sensors[sid] = payload.decode()
+        elif kind == NUMBER:
+            entries.append((t, sensors[sid], struct.unpack("<d", payload)[0]))
+        else:
+            entries.append((t, sensors[sid], payload.decode()))
+    return entries
+
+
+def _read_bytes(path):
+    if path.endswith(".gz"):
+        with gzip.open(path, "rb") as f:
+            return f.read()
+    if path.endswith(".zst"):
+        import pyarrow as pa
+        with pa.input_stream(path, compression="zstd") as f:
+            return f.read()
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _compress(path, compression):
+    target = path + COMPRESSIONS[compression]
+    with open(path, "rb") as src:
+        if compression == "gzip":
+            with gzip.open(target + ".tmp", "wb") as dst:
+                _copy(src, dst)
+        else:
+            import pyarrow as pa
+            with pa.output_stream(target + ".tmp", compression="zstd") as dst:
+                _copy(src, dst)
+    os.replace(target + ".tmp", target)
+    os.remove(path)
+
+
+def _copy(src, dst, size=1 << 20):
+    while chunk := src.read(size):
+        dst.write(chunk)
@@ -0,0 +1,191 @@
+import json
+import heapq
+import os
+from collections import deque
+import numpy as np
+
+
+class RollingCounter:
+    # Event counts in one-second buckets over the last `window` seconds,
+    # one column per sensor.
+    def __init__(self, window=60, width=0):
+        self.window = window
+        self._counts = np.zeros((window, width), dtype=np.int64)
+        self._seconds = np.full(window, -1, dtype=np.int64)
+
+    def grow(self, width):
+        extra = width - self._counts.shape[1]
+        if extra > 0:
+            self._counts = np.pad(self._counts, ((0, 0), (0, extra)))
+
+    def add(self, timestamps, events, columns):
+        # `events` is an (n, len(columns)) mask; rows are summed per second
+        # with one reduceat, so the cost does not depend on sensor count.
+        seconds = np.asarray(timestamps) // 1_000_000_000
+        if len(seconds) > 1 and (np.diff(seconds) < 0).any():
+            order = np.argsort(seconds, kind="stable")
+            seconds, events = seconds[order], events[order]
+        starts = np.flatnonzero(np.diff(seconds, prepend=seconds[0] - 1))
+        self._add_sums(seconds[starts], np.add.reduceat(events, starts, axis=0, dtype=np.int64),
+                       columns)
+
+    def merge(self, other, columns):
+        live = other._seconds >= 0
+        order = np.argsort(other._seconds[live])
+        self._add_sums(other._seconds[live][order], other._counts[live][order], columns)
+
+    def _add_sums(self, seconds, sums, columns):
+        # `seconds` ascending and distinct, one row of `sums` per second.
+        unique, sums = seconds[-self.window:], sums[-self.window:]
+        slots = unique % self.window
+        # Seconds older than what a bucket already holds have aged out.
+        fresh = unique >= self._seconds[slots]
+        unique, sums, slots = unique[fresh], sums[fresh], slots[fresh]
+        stale = self._seconds[slots] != unique
+        self._counts[slots[stale]] = 0
+        self._seconds[slots] = unique
+        self._counts[np.ix_(slots, columns)] += sums
+
+    def rate(self, column, now_ns):
+        now = now_ns // 1_000_000_000
+        live = (self._seconds > now - self.window) & (self._seconds <= now)
+        return float(self._counts[live, column].sum()) / self.window
+
+
+class FaultRegistry:
+    # Per-sensor counters live in arrays indexed by sensor id, so a batch
+    # with faults on thousands of channels updates them in a few NumPy calls.
+    # Every entry also goes to `stream` (a faultlog.FaultLog) when given,
+    # so the full log reaches disk while `log` keeps the latest in memory.
+    def __init__(self, status_labels, max_log=10_000, window=60, spill_path=None, stream=None):
+        self.status_labels = tuple(status_labels)
+        self.status_counts = np.zeros(len(self.status_labels), dtype=np.int64)
+        self.sensors = []
+        self._ids = {}
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._first = np.zeros(0, dtype=np.int64)
+        self._last = np.zeros(0, dtype=np.int64)
+        self._seen = []
+        self.total = 0
+        self.window = window
+        self._rolling = RollingCounter(window)
+        self.log = deque(maxlen=max_log)
+        self.stream = stream
+        self.spill_path = spill_path
+        self.spilled = 0
+        self._spill = None
+        if spill_path:
+            os.makedirs(os.path.dirname(spill_path) or ".", exist_ok=True)
+            self._spill = open(spill_path, "a")
+
+    @property
+    def counts(self):
+        # Sensors in order of their first fault.
+        return {self.sensors[i]: int(self._counts[i]) for i in self._seen}
+
+    @property
+    def first_seen(self):
+        return {self.sensors[i]: int(self._first[i]) for i in self._seen}
+
+    @property
+    def last_seen(self):
+        return {self.sensors[i]: int(self._last[i]) for i in self._seen}
+
+    def sensor_ids(self, sensors):
+        for sensor in sensors:
+            if sensor not in self._ids:
+                self._ids[sensor] = len(self.sensors)
+                self.sensors.append(sensor)
+        size = len(self.sensors)
+        if size > len(self._counts):
+            pad = size - len(self._counts)
+            self._counts = np.pad(self._counts, (0, pad))
+            self._first = np.pad(self._first, (0, pad))
+            self._last = np.pad(self._last, (0, pad))
+            self._rolling.grow(size)
+        return np.array([self._ids[sensor] for sensor in sensors], dtype=np.intp)
+
+    def count(self, sensor, timestamps):
+        timestamps = np.asarray(timestamps)
+        self.count_events(self.sensor_ids([sensor]), timestamps,
+                          np.ones((len(timestamps), 1), dtype=bool))
+
+    def count_events(self, ids, timestamps, events):
+        # `events` is an (n, len(ids)) mask of faults per sample and sensor;
+        # ids must be distinct.
+        per_sensor = events.sum(axis=0)
+        hit = np.flatnonzero(per_sensor)
+        if not hit.size:
+            return
+        events = events[:, hit]
+        ids = ids[hit]
+        new = self._counts[ids] == 0
+        if new.any():
+            self._first[ids[new]] = timestamps[events[:, new].argmax(axis=0)]
+            self._seen.extend(ids[new].tolist())
+        last = timestamps[len(timestamps) - 1 - events[::-1].argmax(axis=0)]
+        self._last[ids] = np.maximum(self._last[ids], last)
+        self._counts[ids] += per_sensor[hit]
+        self.total += int(per_sensor[hit].sum())
+        self._rolling.add(timestamps, events, ids)
+
+    def merge(self, other):
+        # Folds in a registry filled elsewhere, e.g. by a fleet worker.
+        self.status_counts += other.status_counts
+        if other._seen:
+            ids = self.sensor_ids(other.sensors)
+            seen = np.array(other._seen, dtype=np.intp)
+            mine = ids[seen]
+            new = self._counts[mine] == 0
+            self._seen.extend(mine[new].tolist())
+            self._first[mine] = np.where(new, other._first[seen],
+                                         np.minimum(self._first[mine], other._first[seen]))
+            self._last[mine] = np.maximum(self._last[mine], other._last[seen])
+            self._counts[mine] += other._counts[seen]
+            self._rolling.merge(other._rolling, ids)
+        self.total += other.total
+        entries = list(heapq.merge(self.log, other.log, key=lambda entry: entry[0]))
+        self.log.clear()
+        self.extend(entries)
+
+    def count_status(self, status):
+        self.status_counts += np.bincount(status, minlength=len(self.status_labels))
+
+    def log_capacity(self, n):
+        # Entries the raw log would drop straight away are not worth building
+        # unless they are being streamed or spilled to disk.
+        if self._spill is not None or self.stream is not None:
+            return n
+        return min(n, self.log.maxlen)
+
+    def extend(self, entries):
+        entries = list(entries)
+        if self.stream is not None and entries:
+            self.stream.write(entries)
+        if self._spill is not None:
+            overflow = len(self.log) + len(entries) - self.log.maxlen
+            evicted = [self.log.popleft() for _ in range(min(overflow, len(self.log)))]
+            evicted += entries[:max(0, len(entries) - self.log.maxlen)]
+            for t, sensor, issue in evicted:
+                self._spill.write(json.dumps({"Time": t, "Sensor": sensor, "Issue": issue}) + "\n")
+            self.spilled += len(evicted)
+        self.log.extend(entries)
+
+    def rate(self, sensor, now_ns):
+        i = self._ids.get(sensor)
+        return self._rolling.rate(i, now_ns) if i is not None else 0.0
+
+    def summary(self, now_ns):
+        return {self.sensors[i]: {
+            "count": int(self._counts[i]),
+            "first_seen": int(self._first[i]),
+            "last_seen": int(self._last[i]),
+            "rate_per_s": self._rolling.rate(i, now_ns),
+        } for i in self._seen}
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.close()
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
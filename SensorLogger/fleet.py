@@ -0,0 +1,129 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from .storage import STATUS_LABELS, sensor_columns
+from .schema import ChannelSchema, default_schema
+from .stats import OnlineStats
+from .faults import FaultRegistry
+
+
+def fleet_columns(channels):
+    return sensor_columns(channels) + [("stand", np.uint32)]
+
+
+def _views(shms, dtype, rows):
+    return {name: np.ndarray(rows, dtype[name], buffer=shms[name].buf)
+            for name in dtype.names}
+
+
+def _run_shard(stands, seeds, samples, batch, rate_hz, start_ns, schema, buffers, rows,
+               max_log, stand_log):
+    from .simulator import SensorSimulator
+
+    shms = {name: SharedMemory(name=shm) for name, shm in buffers.items()}
+    columns = _views(shms, np.dtype(fleet_columns(len(schema))), rows)
+    try:
+        stats = OnlineStats(schema.names)
+        faults = FaultRegistry(STATUS_LABELS, max_log)
+        period = round(1e9 / rate_hz)
+        for stand, seed in zip(stands, seeds):
+            schema.reset()
+            # The shared columns are the record, so the simulator's own ring
+            # only needs to hold a single row.
+            sim = SensorSimulator(capacity=1, seed=seed, sinks=[], schema=schema,
+                                  max_error_log=stand_log, fault_log=None)
+            base = stand * samples
+            for offset in range(0, samples, batch):
+                n = min(batch, samples - offset)
+                timestamps = start_ns + (offset + np.arange(n, dtype=np.int64)) * period
+                block = sim.generate_batch(n, timestamps)
+                for name, values in block.items():
+                    columns[name][base + offset:base + offset + n] = values
+            columns["stand"][base:base + samples] = stand
+            stats.merge(sim.stats)
+            faults.merge(sim.faults)
+        return stats, faults
+    finally:
+        columns.clear()
+        for shm in shms.values():
+            shm.close()
+
+
+class FleetResult:
+    # Samples from every stand in shared-memory columns; stand s owns rows
+    # [s * samples, (s + 1) * samples). close() releases the memory, so
+    # views taken from `columns` must be dropped (or copied) first.
+    def __init__(self, shms, columns, stats, faults, elapsed):
+        self._shms = shms
+        self.columns = columns
+        self.stats = stats
+        self.faults = faults
+        self.elapsed = elapsed
+
+    def __len__(self):
+        return len(self.columns["timestamp"])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def rate(self):
+        return len(self) / self.elapsed if self.elapsed > 0 else float("inf")
+
+    def close(self):
+        self.columns = {}
+        for shm in self._shms.values():
+            shm.close()
+            shm.unlink()
+        self._shms = {}
+
+
+def run_fleet(stands, samples, workers=None, seed=None, schema=None, rate_hz=1000.0,
+              batch=10_000, max_error_log=10_000):
+    # Every stand gets its own child of one SeedSequence, so a fleet run is
+    # reproducible from `seed` whatever the number of workers.
+    if stands < 1 or samples < 1:
+        raise ValueError("stands and samples must be at least 1")
+    if schema is None:
+        schema = default_schema()
+    elif isinstance(schema, str):
+        schema = ChannelSchema.load(schema)
+    workers = min(workers or os.cpu_count() or 1, stands)
+    seeds = np.random.SeedSequence(seed).spawn(stands)
+    # All stands share one clock, so the newest entries of the merged error
+    # log are spread evenly over them; each stand only keeps its share.
+    stand_log = -(-max_error_log // stands)
+
+    dtype = np.dtype(fleet_columns(len(schema)))
+    rows = stands * samples
+    shms = {name: SharedMemory(create=True, size=rows * dtype[name].itemsize)
+            for name in dtype.names}
+    columns = _views(shms, dtype, rows)
+    try:
+        buffers = {name: shm.name for name, shm in shms.items()}
+        start_ns = time.time_ns()
+        started = time.perf_counter()
+        stats = OnlineStats(schema.names)
+        faults = FaultRegistry(STATUS_LABELS, max_error_log)
+        with ProcessPoolExecutor(workers) as pool:
+            shards = np.array_split(np.arange(stands), workers)
+            futures = [pool.submit(_run_shard, shard.tolist(), seeds[shard[0]:shard[-1] + 1],
+                                   samples, batch, rate_hz, start_ns, schema, buffers, rows,
+                                   max_error_log, stand_log)
+                       for shard in shards]
+            for future in futures:
+                shard_stats, shard_faults = future.result()
+                stats.merge(shard_stats)
+                faults.merge(shard_faults)
+        elapsed = time.perf_counter() - started
+    except BaseException:
+        columns.clear()
+        for shm in shms.values():
+            shm.close()
+            shm.unlink()
+        raise
+    return FleetResult(shms, columns, stats, faults, elapsed)
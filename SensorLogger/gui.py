@@ -0,0 +1,334 @@
+import os
+import tkinter as tk
+from tkinter import ttk, messagebox
+import numpy
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+import matplotlib.pyplot as plt
+from .storage import ColumnStore, STATUS_LABELS, sensor_columns
+from .simulator import SensorSimulator
+from .sinks import format_time, parse_time
+from .plotting import LivePlot, HistoryPlot
+from .decimate import M4Decimator, bucket_size_for
+from .channel import SampleChannel
+from .engine import (Engine, EngineThread, SimulatorSource, RingSource, ReplaySource,
+                     ArchiveTask, ChannelTask)
+from .sharedstore import SharedColumnStore
+
+
+MAX_READINGS = 8
+REPLAY_SPEEDS = {"1x": 1.0, "10x": 10.0, "1000x": 1000.0, "max": 0.0}
+
+
+class SensorGUI:
+    def __init__(self, root, refresh_ms=1000, window=20, overflow="drop_oldest", schema=None,
+                 attach=None, replay=None, speed=1.0):
+        self.root = root
+        self.root.title("Sensor Logger ")
+        self.ring = self.source = None
+        if attach:
+            # Viewer for a separate acquisition process: rows are read from
+            # its shared ring and checked again here for stats and faults,
+            # which that process already archives and streams to its fault log.
+            self.sim = SensorSimulator(schema=schema, sinks=[], fault_log=None)
+            self.ring = SharedColumnStore.attach(attach, sensor_columns(len(self.sim.schema)))
+            self.source = RingSource(self.ring, paused=lambda: self.sim.paused)
+        elif replay:
+            # Post-test review: a recorded log goes through the same checks
+            # and display as live data, and nothing is archived again.
+            self.sim = SensorSimulator(schema=schema, sinks=[], fault_log=None)
+            self.source = ReplaySource(replay, speed, schema=self.sim.schema,
+                                       paused=lambda: self.sim.paused)
+        else:
+            self.sim = SensorSimulator(schema=schema)
+            self.source = SimulatorSource(self.sim)
+        self.schema = self.sim.schema
+        self.channel = SampleChannel(policy=overflow)
+        self.engine_thread = None
+        self.refresh_ms = refresh_ms
+        self.t0 = None
+        self.last_ts = None
+        # Two channels are plotted: temp1 and pressure when the schema has
+        # them, otherwise the first two.
+        names = self.schema.names
+        self.plot_names = (("temp1", "pressure") if {"temp1", "pressure"} <= set(names)
+                           else names[:2])
+        self.plot_index = [self.schema.index[name] for name in self.plot_names]
+        self.plot_columns = [("x", numpy.float64)] + [
+            (name, numpy.float64) for name in self.plot_names]
+        self.window = ColumnStore(self.plot_columns, capacity=window)
+        self.decimators = None
+
+        self.build_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.update_ui()
+
+    def build_ui(self):
+        # Controls Frame
+        control_frame = ttk.LabelFrame(self.root, text="Controls")
+        control_frame.pack(fill="x", padx=10, pady=5)
+
+        ttk.Button(control_frame, text="Start", command=self.start_logging).pack(
+            side="left", padx=5, pady=5)
+        ttk.Button(control_frame, text="Pause",
+                   command=self.pause_logging).pack(side="left", padx=5)
+        ttk.Button(control_frame, text="Resume",
+                   command=self.resume_logging).pack(side="left", padx=5)
+        ttk.Button(control_frame, text="Stop",
+                   command=self.stop_logging).pack(side="left", padx=5)
+        ttk.Button(control_frame, text="Export",
+                   command=self.export_data).pack(side="left", padx=5)
+
+        ttk.Label(control_frame, text="Window:").pack(side="left", padx=(15, 2))
+        self.window_var = tk.IntVar(value=self.window.capacity)
+        window_box = ttk.Spinbox(control_frame, from_=20, to=100_000, increment=20,
+                                 width=8, textvariable=self.window_var,
+                                 command=self.resize_window)
+        window_box.pack(side="left")
+        window_box.bind("<Return>", lambda event: self.resize_window())
+
+        ttk.Button(control_frame, text="History",
+                   command=self.open_history).pack(side="left", padx=5)
+
+        if isinstance(self.source, ReplaySource):
+            self.build_replay_controls()
+
+        # Live Reading Display
+        self.reading_frame = ttk.LabelFrame(self.root, text="Live Sensor Data")
+        self.reading_frame.pack(fill="x", padx=10, pady=5)
+
+        self.reading_vars = []
+        for channel in self.schema.channels[:MAX_READINGS]:
+            var = tk.StringVar(value=f"{channel.label}: -- {channel.units}")
+            ttk.Label(self.reading_frame, textvariable=var).pack(side="left", padx=10)
+            self.reading_vars.append(var)
+
+        # Status Frame
+        status_frame = ttk.LabelFrame(self.root, text="System Status")
+        status_frame.pack(fill="x", padx=10, pady=5)
+
+        self.status_label = ttk.Label(status_frame, text="Status: --")
+        self.status_label.pack(side="left", padx=10)
+
+        self.score_label = ttk.Label(status_frame, text="Health Score: --")
+        self.score_label.pack(side="left", padx=10)
+
+        self.trend_label = ttk.Label(status_frame, text="Trend: --")
+        self.trend_label.pack(side="left", padx=10)
+
+        self.stats_label = ttk.Label(status_frame, text="Stats: --")
+        self.stats_label.pack(side="left", padx=10)
+
+        self.queue_label = ttk.Label(status_frame, text="Queue: --")
+        self.queue_label.pack(side="left", padx=10)
+
+        # Graph Area
+        self.fig, self.ax = plt.subplots(2, 1, figsize=(6, 4))
+        self.fig.tight_layout()
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.root)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
+        self.plot = LivePlot(self.fig, self.ax, self.plot_labels(),
+                             ("red", "blue"), x_formatter=self.format_x)
+
+    def build_replay_controls(self):
+        replay_frame = ttk.LabelFrame(self.root, text="Replay")
+        replay_frame.pack(fill="x", padx=10, pady=5)
+
+        ttk.Label(replay_frame, text="Speed:").pack(side="left", padx=(5, 2))
+        speed = next((label for label, value in REPLAY_SPEEDS.items()
+                      if value == self.source.speed), f"{self.source.speed:g}x")
+        self.speed_var = tk.StringVar(value=speed)
+        speed_box = ttk.Combobox(replay_frame, textvariable=self.speed_var, width=6,
+                                 values=list(REPLAY_SPEEDS), state="readonly")
+        speed_box.pack(side="left")
+        speed_box.bind("<<ComboboxSelected>>", lambda event: self.set_replay_speed())
+
+        ttk.Label(replay_frame, text="Seek to:").pack(side="left", padx=(15, 2))
+        self.seek_var = tk.StringVar()
+        seek_box = ttk.Entry(replay_frame, textvariable=self.seek_var, width=20)
+        seek_box.pack(side="left")
+        seek_box.bind("<Return>", lambda event: self.seek_replay())
+        ttk.Button(replay_frame, text="Seek", command=self.seek_replay).pack(side="left", padx=5)
+
+        self.position_label = ttk.Label(replay_frame, text="Position: --")
+        self.position_label.pack(side="left", padx=10)
+
+    def set_replay_speed(self):
+        self.source.speed = REPLAY_SPEEDS[self.speed_var.get()]
+
+    def seek_replay(self):
+        # Accepts HH:MM:SS on the day being replayed, a full date and time,
+        # or epoch nanoseconds.
+        day = self.source.position
+        try:
+            if day is None:
+                day = self.source.start_time()
+            timestamp = parse_time(self.seek_var.get(), day)
+        except (ValueError, OSError) as exc:
+            messagebox.showerror("Seek", str(exc))
+            return
+        self.source.seek(timestamp)
+
+    def reset_view(self):
+        self.window = ColumnStore(self.plot_columns, capacity=self.window.capacity)
+        self.decimators = None
+        self.t0 = None
+
+    def plot_labels(self):
+        channels = [self.schema.channels[i] for i in self.plot_index]
+        return [f"{ch.label} ({ch.units})" if ch.units else ch.label for ch in channels]
+
+    def resize_window(self):
+        try:
+            size = min(max(int(self.window_var.get()), 20), 100_000)
+        except (tk.TclError, ValueError):
+            return
+        self.window_var.set(size)
+        if size != self.window.capacity:
+            window = ColumnStore(self.plot_columns, capacity=size)
+            window.extend(self.window.columns(size))
+            self.window = window
+            self.decimators = None
+
+    def reset_decimators(self):
+        # Bucket size tracks window length over pixel width, so a window of
+        # any length draws about four points per pixel column.
+        width = self.plot.pixel_width()
+        size = bucket_size_for(self.window.capacity, width)
+        self.decimators = {}
+        for name in self.plot_names:
+            decimator = M4Decimator(size, self.window.capacity)
+            decimator.update(self.window["x"], self.window[name])
+            self.decimators[name] = decimator
+        self._decimated_width = width
+
+    def open_history(self):
+        if not self.sim.data.total:
+            return
+        top = tk.Toplevel(self.root)
+        top.title("Sensor History")
+        fig, ax = plt.subplots(2, 1, figsize=(8, 5), sharex=True)
+        canvas = FigureCanvasTkAgg(fig, master=top)
+        NavigationToolbar2Tk(canvas, top)
+        canvas.get_tk_widget().pack(fill="both", expand=True)
+        t0 = self.t0 if self.t0 is not None else self.sim.data["timestamp"][0]
+        ttk.Button(top, text="Export view",
+                   command=lambda: self.export_range(*top.history.visible())).pack(anchor="w")
+        top.history = HistoryPlot(fig, ax, self.history_blocks, self.plot_names,
+                                  self.plot_labels(), ("red", "blue"),
+                                  t0, x_formatter=self.format_x)
+        top.protocol("WM_DELETE_WINDOW", lambda: (plt.close(fig), top.destroy()))
+
+    def history_blocks(self, start=None, end=None):
+        for block in self.sim.data.query_blocks(start, end):
+            yield self.schema.select(block, self.plot_names)
+
+    def export_range(self, start, end):
+        path = os.path.join(self.sim.report_dir, "sensor_data_range.csv")
+        rows = self.sim.export_range(path, start, end)
+        messagebox.showinfo("Export", f"{rows} rows saved to {path}.")
+
+    def format_x(self, x, pos=None):
+        if self.t0 is None:
+            return ""
+        return format_time([self.t0 + int(x * 1e9)])[0]
+
+    def start_logging(self):
+        # Acquisition runs on an asyncio loop in its own thread; this side
+        # only polls the channel in update_ui and schedules stop().
+        if self.engine_thread is not None and self.engine_thread.is_alive():
+            return
+        self.sim.paused = False
+        sinks = [ArchiveTask(sink) for sink in self.sim.sinks] + [ChannelTask(self.channel)]
+        self.engine_thread = EngineThread(Engine(self.sim, [self.source], sinks))
+        self.engine_thread.start()
+
+    def pause_logging(self):
+        self.sim.paused = True
+        self.status_label.config(text="Status: PAUSED", foreground="orange")
+
+    def resume_logging(self):
+        self.sim.paused = False
+
+    def stop_logging(self):
+        self.sim.stop_logging()
+        if self.engine_thread is not None:
+            self.engine_thread.stop()
+        self.status_label.config(text="Status: STOPPED", foreground="black")
+
+    def close(self):
+        # Closing the window finishes the archive as Stop and Export would,
+        # so the last part of a columnar log is not left without its footer.
+        self.stop_logging()
+        if self.engine_thread is not None:
+            self.engine_thread.join()
+        for sink in self.sim.sinks:
+            sink.close()
+        self.sim.faults.close()
+        plt.close(self.fig)
+        self.root.destroy()
+
+    def export_data(self):
+        self.sim.export_data()
+        messagebox.showinfo(
+            "Export", "Data & reports saved in /reports folder.")
+
+    def update_ui(self):
+        batches = self.channel.drain()
+        if batches:
+            # Every sample produced since the last tick is plotted exactly once.
+            blocks = [block for _, block in batches]
+            for block in blocks:
+                if self.last_ts is not None and block["timestamp"][0] < self.last_ts:
+                    # A replay was sought backwards: start the plot afresh.
+                    self.reset_view()
+                self.last_ts = int(block["timestamp"][-1])
+                if self.t0 is None:
+                    self.t0 = int(block["timestamp"][0])
+                x = (block["timestamp"] - self.t0) / 1e9
+                columns = self.schema.select(block, self.plot_names)
+                columns["x"] = x
+                del columns["timestamp"]
+                self.window.extend(columns)
+                if self.decimators is not None:
+                    for name in self.plot_names:
+                        self.decimators[name].update(x, columns[name])
+            if self.decimators is None or self._decimated_width != self.plot.pixel_width():
+                self.reset_decimators()
+            self.plot.update([self.decimators[name].points() for name in self.plot_names])
+
+            last = blocks[-1]
+            values = last["values"][-1].tolist()
+            status = STATUS_LABELS[last["status"][-1]]
+
+            # Update live readings
+            for var, channel, value in zip(self.reading_vars, self.schema.channels, values):
+                value = "--" if numpy.isnan(value) else value
+                var.set(f"{channel.label}: {value} {channel.units}")
+
+            # Update status with color
+            self.status_label.config(
+                text=f"Status: {status}", foreground="green" if status == "OK" else "red")
+            self.score_label.config(
+                text=f"Health Score: {max(0, 100 - self.sim.faults.total)}")
+            # Least-squares trend over the simulator's rolling window, not
+            # just the last few plotted points.
+            first = self.plot_index[0]
+            rolling, channel = self.sim.rolling, self.schema.channels[first]
+            self.trend_label.config(
+                text=f"Trend: {rolling.trend()[first]} ({rolling.rate()[first]:+.2f} "
+                     f"{channel.units}/s, σ {rolling.std()[first]:.2f})")
+
+            mean, std = self.sim.stats.mean, self.sim.stats.std()
+            channels = self.schema.channels
+            self.stats_label.config(text="Stats: " + ", ".join(
+                f"{channels[i].label} {mean[i]:.2f} ± {std[i]:.2f} {channels[i].units}".rstrip()
+                for i in self.plot_index))
+
+            if isinstance(self.source, ReplaySource):
+                self.position_label.config(text=f"Position: {format_time([self.last_ts])[0]}")
+
+            queue = self.channel.stats()
+            self.queue_label.config(
+                text=f"Queue: peak {queue['max_depth']}, dropped {queue['missed']}")
+
+        self.root.after(self.refresh_ms, self.update_ui)
@@ -0,0 +1,120 @@
+import numpy as np
+from matplotlib.ticker import FuncFormatter
+from .decimate import decimate_range
+
+
+class LivePlot:
+    # Lines are created once and marked animated, so a full canvas draw only
+    # happens when limits change; every other frame restores the cached
+    # background and repaints just the lines.
+    def __init__(self, fig, axes, labels, colors, x_formatter=None, margin=0.1):
+        self.fig = fig
+        self.canvas = fig.canvas
+        self.axes = list(axes)
+        self.margin = margin
+        self.lines = []
+        for ax, label, color in zip(self.axes, labels, colors):
+            (line,) = ax.plot([], [], color=color, animated=True)
+            ax.set_ylabel(label)
+            ax.tick_params(axis="x", rotation=45)
+            if x_formatter is not None:
+                ax.xaxis.set_major_formatter(FuncFormatter(x_formatter))
+            self.lines.append(line)
+        self.rescales = 0
+        self._background = None
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def pixel_width(self):
+        return max(1, int(self.axes[0].get_window_extent().width))
+
+    def update(self, series):
+        if not any(len(x) for x, _ in series):
+            return
+        for line, (x, y) in zip(self.lines, series):
+            line.set_data(x, y)
+
+        if self._rescale(series) or self._background is None:
+            self.rescales += 1
+            self.canvas.draw()
+            return
+
+        self.canvas.restore_region(self._background)
+        for ax, line in zip(self.axes, self.lines):
+            ax.draw_artist(line)
+        self.canvas.blit(self.fig.bbox)
+
+    def _rescale(self, series):
+        changed = False
+        for ax, (x, y) in zip(self.axes, series):
+            if not len(x):
+                continue
+            x_lo, x_hi = x[0], x[-1]
+            lo, hi = ax.get_xlim()
+            if x_lo < lo or x_hi > hi:
+                # Leave headroom on the right so a scrolling window only
+                # triggers a full redraw every few frames.
+                span = max(x_hi - x_lo, 1e-9)
+                ax.set_xlim(x_lo, x_lo + span * (1 + 2 * self.margin))
+                changed = True
+
+            finite = y[np.isfinite(y)]
+            if not finite.size:
+                continue
+            y_lo, y_hi = finite.min(), finite.max()
+            lo, hi = ax.get_ylim()
+            if y_lo < lo or y_hi > hi:
+                pad = max(y_hi - y_lo, 1.0) * self.margin
+                ax.set_ylim(y_lo - pad, y_hi + pad)
+                changed = True
+        return changed
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        for ax, line in zip(self.axes, self.lines):
+            ax.draw_artist(line)
+
+
+class HistoryPlot:
+    # Zoomable view over the whole run. Every zoom re-reads only the visible
+    # time range through `history(start, end)`, a callable yielding column
+    # blocks for that range, and reduces it to the axis pixel width.
+    def __init__(self, fig, axes, history, names, labels, colors, t0, x_formatter=None):
+        self.fig = fig
+        self.axes = list(axes)
+        self.history = history
+        self.names = tuple(names)
+        self.t0 = t0
+        self.lines = []
+        for ax, label, color in zip(self.axes, labels, colors):
+            (line,) = ax.plot([], [], color=color)
+            ax.set_ylabel(label)
+            ax.tick_params(axis="x", rotation=45)
+            if x_formatter is not None:
+                ax.xaxis.set_major_formatter(FuncFormatter(x_formatter))
+            self.lines.append(line)
+        self._range = None
+        self.load()
+        for ax in self.axes:
+            ax.relim()
+            ax.autoscale_view()
+        for ax in self.axes:
+            ax.callbacks.connect("xlim_changed", self._on_zoom)
+
+    def load(self, start=None, end=None):
+        self._range = (start, end)
+        width = max(1, int(self.axes[0].get_window_extent().width))
+        data = decimate_range(self.history(start, end), self.names, start, end, width)
+        for line, name in zip(self.lines, self.names):
+            x, y = data[name]
+            line.set_data((x - self.t0) / 1e9, y)
+        self.fig.canvas.draw_idle()
+
+    def visible(self):
+        # (start, end) in epoch ns of the loaded range; None is unbounded.
+        return self._range
+
+    def _on_zoom(self, ax):
+        lo, hi = ax.get_xlim()
+        start, end = self.t0 + int(lo * 1e9), self.t0 + int(hi * 1e9)
+        if (start, end) != self._range:
+            self.load(start, end)
@@ -0,0 +1,172 @@
+import numpy as np
+from .storage import STATUS_CODES
+
+
+# One bit per rule kind in the per-sample `faults` column.
+MISSING = 1
+LIMIT = 2
+REDUNDANCY = 4
+RATE = 8
+STUCK = 16
+FAULT_BITS = {"missing": MISSING, "limit": LIMIT, "redundancy": REDUNDANCY,
+              "rate": RATE, "stuck": STUCK}
+
+# The status column keeps the single most severe fault of each sample,
+# lowest first. Ranks are explicit rather than an effect of statement order.
+STATUS_PRIORITY = ("OK", "STUCK SENSOR", "RATE FAULT", "SENSOR FAIL", "TEMP SENSOR FAIL",
+                   "SENSOR MISMATCH", "TEMP SENSOR MISMATCH", "LIMIT FAULT", "PRESSURE FAULT")
+STATUS_RANK = {label: rank for rank, label in enumerate(STATUS_PRIORITY)}
+_RANK_TO_CODE = np.array([STATUS_CODES[label] for label in STATUS_PRIORITY], dtype=np.uint8)
+
+
+def fault_names(bits):
+    return [name for name, bit in FAULT_BITS.items() if bits & bit]
+
+
+class RuleSet:
+    # The checks a ChannelSchema declares, compiled into per-channel arrays
+    # so every rule is a few NumPy mask operations over a whole batch.
+    # Rate-of-change and stuck-value rules compare each reading with the
+    # channel's previous valid one, which is carried across batches.
+    def __init__(self, schema):
+        self.schema = schema
+        channels = schema.channels
+        # Missing readings and limit breaches are reported under each
+        # channel's own status, redundancy spreads under their group's.
+        limited = [ch.limits is not None for ch in channels]
+        self._ranked = {
+            "missing": _ranks([ch.missing_status for ch in channels]),
+            "redundancy": _ranks(schema.group_status),
+            "limit": _ranks([ch.limit_status for ch in channels], limited),
+        }
+
+        self.rate_cols = np.array([i for i, ch in enumerate(channels) if ch.max_rate is not None],
+                                  dtype=np.intp)
+        self.max_rate = np.array([channels[i].max_rate for i in self.rate_cols], dtype=np.float64)
+        self.stuck_cols = np.array([i for i, ch in enumerate(channels) if ch.stuck], dtype=np.intp)
+        # `stuck` identical readings in a row are `stuck - 1` repeats.
+        self.stuck_repeats = np.array([channels[i].stuck - 1 for i in self.stuck_cols])
+        history = np.union1d(self.rate_cols, self.stuck_cols)
+        self._history_size = len(history)
+        # Column selections become plain slices when a rule covers every
+        # column, which saves a gathered copy of the batch per rule.
+        self._history = _columns(history, len(channels))
+        self._rate = _columns(self.rate_cols, len(channels))
+        self._stuck = _columns(self.stuck_cols, len(channels))
+        self._rate_pos = _columns(np.searchsorted(history, self.rate_cols), len(history))
+        self._stuck_pos = _columns(np.searchsorted(history, self.stuck_cols), len(history))
+        self.reset()
+
+    def reset(self):
+        k = self._history_size
+        self._last_value = np.full(k, np.nan)
+        self._last_time = np.zeros(k, dtype=np.int64)
+        self._repeats = np.zeros(len(self.stuck_cols), dtype=np.int64)
+
+    def evaluate(self, timestamps, values):
+        # Returns the per-channel masks, the per-sample fault bitmask and
+        # the status codes for one batch.
+        n, channels = values.shape
+        missing = np.isnan(values)
+        limit = self.schema.limit_faults(values)
+        redundancy = self.schema.redundancy_faults(values)
+        rate = np.zeros((n, channels), dtype=bool)
+        stuck = np.zeros((n, channels), dtype=bool)
+        if self._history_size and n:
+            rate[:, self._rate], stuck[:, self._stuck] = self._check_history(
+                timestamps, values[:, self._history], ~missing[:, self._history])
+
+        masks = {"missing": missing, "limit": limit, "redundancy": redundancy,
+                 "rate": rate, "stuck": stuck}
+        faults = np.zeros(n, dtype=np.uint8)
+        rank = np.zeros(n, dtype=np.uint8)
+        for name, label in (("rate", "RATE FAULT"), ("stuck", "STUCK SENSOR")):
+            hit = masks[name].any(axis=1)
+            faults |= hit * np.uint8(FAULT_BITS[name])
+            np.maximum(rank, hit * np.uint8(STATUS_RANK[label]), out=rank)
+        for name, (ranks, shared) in self._ranked.items():
+            mask = masks[name]
+            hit = mask.any(axis=1)
+            faults |= hit * np.uint8(FAULT_BITS[name])
+            if shared is not None:
+                np.maximum(rank, hit * shared, out=rank)
+            elif hit.any():
+                # Columns report this rule under different statuses.
+                rows = np.flatnonzero(hit)
+                worst = np.where(mask[rows], ranks, 0).max(axis=1)
+                rank[rows] = np.maximum(rank[rows], worst)
+        return masks, faults, _RANK_TO_CODE[rank]
+
+    def _check_history(self, timestamps, values, valid):
+        n, k = values.shape
+        if valid.all():
+            previous = np.empty_like(values)
+            previous[0] = self._last_value
+            previous[1:] = values[:-1]
+            # Seconds since the previous reading: one column for the whole
+            # batch, except the first row, whose readings may be older.
+            elapsed = np.empty((n, 1))
+            elapsed[1:, 0] = np.diff(timestamps) / 1e9
+            elapsed[0] = np.nan
+            first = (timestamps[0] - self._last_time) / 1e9
+        else:
+            # Row (1-based) of each channel's latest valid reading before
+            # this one; 0 stands for the reading carried from the last batch.
+            latest = np.maximum.accumulate(
+                np.where(valid, np.arange(1, n + 1)[:, None], 0), axis=0)
+            prior = np.vstack([np.zeros((1, k), dtype=latest.dtype), latest[:-1]])
+            carried = prior == 0
+            index = np.maximum(prior - 1, 0)
+            previous = np.where(carried, self._last_value, values[index, np.arange(k)])
+            elapsed = (timestamps[:, None]
+                       - np.where(carried, self._last_time, timestamps[index])) / 1e9
+            first = elapsed[0]
+
+        # Comparisons with NaN are false, so a missing reading, or one with
+        # no valid predecessor yet, never trips either rule. Nor does a
+        # reading stamped no later than its predecessor: no time has passed
+        # to measure a rate over.
+        rate = np.zeros((n, len(self.rate_cols)), dtype=bool)
+        if len(self.rate_cols):
+            p = self._rate_pos
+            step = np.abs(values[:, p] - previous[:, p])
+            elapsed = elapsed if elapsed.shape[1] == 1 else elapsed[:, p]
+            rate = (step > self.max_rate * elapsed) & (elapsed > 0)
+            rate[0] = (step[0] > self.max_rate * first[p]) & (first[p] > 0)
+
+        stuck = np.zeros((n, len(self.stuck_cols)), dtype=bool)
+        if len(self.stuck_cols):
+            p = self._stuck_pos
+            same = values[:, p] == previous[:, p]
+            # Length of the current run of repeats: repeats so far minus the
+            # count at the latest change, starting from the carried run.
+            repeats = np.cumsum(same, axis=0, dtype=np.int32)
+            changed = valid[:, p] & ~same
+            floor = np.where(changed, repeats, np.iinfo(np.int32).min)
+            floor[0] = np.maximum(floor[0], -self._repeats)
+            run = repeats - np.maximum.accumulate(floor, axis=0)
+            stuck = valid[:, p] & (run >= self.stuck_repeats)
+            self._repeats = run[-1]
+
+        last = valid.any(axis=0)
+        final = n - 1 - valid[::-1].argmax(axis=0)
+        self._last_value = np.where(last, values[final, np.arange(k)], self._last_value)
+        self._last_time = np.where(last, timestamps[final], self._last_time)
+        return rate, stuck
+
+
+def _ranks(statuses, used=None):
+    # Status ranks per column, and the one rank they share when every
+    # column the rule applies to (all, unless `used` says otherwise)
+    # reports the same status.
+    ranks = np.array([STATUS_RANK[status] for status in statuses], dtype=np.uint8)
+    distinct = set((ranks if used is None else ranks[np.asarray(used, dtype=bool)]).tolist())
+    if len(distinct) > 1:
+        return ranks, None
+    return ranks, np.uint8(distinct.pop() if distinct else 0)
+
+
+def _columns(cols, width):
+    if len(cols) == width and (cols == np.arange(width)).all():
+        return slice(None)
+    return cols
@@ -0,0 +1,100 @@
+import time
+from collections import deque
+import numpy as np
+
+
+POLICIES = ("catch_up", "skip")
+
+
+class RateScheduler:
+    def __init__(self, rate_hz=1.0, policy="catch_up", batch_interval=0.01,
+                 max_catch_up=10, jitter_window=10_000):
+        if not 1 <= rate_hz <= 10_000:
+            raise ValueError("rate_hz must be between 1 and 10000")
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}")
+        self.rate_hz = rate_hz
+        self.policy = policy
+        self.period_ns = round(1_000_000_000 / rate_hz)
+        # Waking once per sample costs more than the sample itself at high
+        # rates, so samples due within `batch_interval` are emitted together.
+        self.batch_size = max(1, int(rate_hz * batch_interval))
+        self.max_batch = self.batch_size * max_catch_up
+        self.samples = 0
+        self.overruns = 0
+        self.skipped = 0
+        self._jitter = deque(maxlen=jitter_window)
+        self.reset()
+
+    def reset(self):
+        self._start = time.monotonic_ns()
+        self._epoch = time.time_ns() - self._start
+        self._index = 0
+        self._emitted = 0
+
+    def delay(self):
+        # Seconds until the next batch is due; callers that cannot block
+        # (an event loop) sleep this long themselves and then call take().
+        return max(0, self._deadline() - time.monotonic_ns()) / 1e9
+
+    def wait(self, interrupt=None):
+        timeout = self.delay()
+        if timeout > 0:
+            if interrupt is not None:
+                if interrupt.wait(timeout):
+                    return None
+            else:
+                time.sleep(timeout)
+        return self.take()
+
+    def take(self):
+        now = time.monotonic_ns()
+        self._jitter.append(now - self._deadline())
+
+        count = self.batch_size
+        due = (now - self._start) // self.period_ns + 1 - self._index
+        if due > self.batch_size:
+            self.overruns += 1
+            if self.policy == "skip":
+                missed = due - self.batch_size
+                self.skipped += missed
+                self._index += missed
+            else:
+                count = min(due, self.max_batch)
+
+        start = self._start + self._index * self.period_ns
+        timestamps = self._epoch + start + np.arange(count, dtype=np.int64) * self.period_ns
+        self._index += count
+        self._emitted += count
+        self.samples += count
+        return timestamps
+
+    def monotonic(self, timestamps):
+        # The monotonic clock readings a batch from take() was scheduled on.
+        return timestamps - self._epoch
+
+    def _deadline(self):
+        return self._start + (self._index + self.batch_size - 1) * self.period_ns
+
+    def achieved_rate(self):
+        # Samples emitted since reset(); those dropped by "skip" do not count.
+        elapsed = time.monotonic_ns() - self._start
+        if self._emitted == 0 or elapsed <= 0:
+            return 0.0
+        return self._emitted * 1e9 / max(elapsed, self._index * self.period_ns)
+
+    def stats(self):
+        jitter = np.fromiter(self._jitter, dtype=np.int64, count=len(self._jitter))
+        p50, p95, p99 = (np.percentile(jitter, (50, 95, 99)) / 1000
+                         if jitter.size else (0.0, 0.0, 0.0))
+        return {
+            "target_hz": self.rate_hz,
+            "achieved_hz": self.achieved_rate(),
+            "batch_size": self.batch_size,
+            "samples": self.samples,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "jitter_p50_us": float(p50),
+            "jitter_p95_us": float(p95),
+            "jitter_p99_us": float(p99),
+        }
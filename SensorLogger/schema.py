@@ -0,0 +1,181 @@
+import json
+import numpy as np
+from .storage import STATUS_CODES
+
+
+MODELS = ("uniform", "normal", "random_walk", "constant")
+
+DEFAULT_SCHEMA = {
+    "decimals": 2,
+    "groups": {"temp": {"tolerance": 3.0, "status": "TEMP SENSOR MISMATCH"}},
+    "channels": [
+        {"name": "temp1", "units": "°C", "group": "temp", "limits": [20, 30],
+         "missing_status": "TEMP SENSOR FAIL",
+         "model": {"type": "uniform", "low": 18.0, "high": 32.0}},
+        {"name": "temp2", "units": "°C", "group": "temp", "dropout": 0.05, "limits": [20, 30],
+         "missing_status": "TEMP SENSOR FAIL",
+         "model": {"type": "uniform", "low": 18.0, "high": 32.0}},
+        {"name": "pressure", "units": "kPa", "limits": [95, 105],
+         "limit_status": "PRESSURE FAULT",
+         "model": {"type": "uniform", "low": 92.0, "high": 108.0}},
+    ],
+}
+
+
+class Channel:
+    # Checks: `limits` [low, high] (breaches reported as `limit_status`),
+    # missing readings (reported as `missing_status`), redundancy through
+    # `group`, `max_rate` in units per second between consecutive readings,
+    # and `stuck`, the number of identical readings in a row that counts as
+    # a stuck sensor.
+    def __init__(self, name, units="", model=None, limits=None, group=None,
+                 dropout=0.0, label=None, max_rate=None, stuck=None,
+                 limit_status="LIMIT FAULT", missing_status="SENSOR FAIL"):
+        self.name = name
+        self.units = units
+        self.model = dict(model or {"type": "uniform", "low": 0.0, "high": 1.0})
+        if self.model.get("type") not in MODELS:
+            raise ValueError(f"channel {name!r}: model type must be one of {MODELS}")
+        self.limits = tuple(limits) if limits else None
+        self.group = group
+        self.dropout = float(dropout)
+        self.label = label or name.capitalize()
+        self.max_rate = None if max_rate is None else float(max_rate)
+        self.stuck = None if stuck is None else int(stuck)
+        if self.stuck is not None and self.stuck < 2:
+            raise ValueError(f"channel {name!r}: stuck must be at least 2 readings")
+        for option, status in (("limit_status", limit_status),
+                               ("missing_status", missing_status)):
+            if status not in STATUS_CODES:
+                raise ValueError(f"channel {name!r}: unknown {option} {status!r}")
+        self.limit_status = limit_status
+        self.missing_status = missing_status
+
+
+class ChannelSchema:
+    # Channels are grouped by model type and redundancy group when the schema
+    # is built, so generation and checks cost a handful of NumPy calls per
+    # batch whether the rig has three channels or two thousand.
+    def __init__(self, channels, groups=None, decimals=2):
+        self.channels = list(channels)
+        self.names = tuple(ch.name for ch in self.channels)
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("channel names must be unique")
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.labels = tuple(ch.label for ch in self.channels)
+        self.units = tuple(ch.units for ch in self.channels)
+        self.decimals = decimals
+
+        self.low_limit = np.array([ch.limits[0] if ch.limits else -np.inf for ch in self.channels])
+        self.high_limit = np.array([ch.limits[1] if ch.limits else np.inf for ch in self.channels])
+        self.dropout = np.array([ch.dropout for ch in self.channels])
+
+        self._models = {}
+        for kind in MODELS:
+            cols = np.array([i for i, ch in enumerate(self.channels)
+                             if ch.model["type"] == kind], dtype=np.intp)
+            if cols.size:
+                models = [self.channels[i].model for i in cols]
+                params = {key: np.array([float(m.get(key, default)) for m in models])
+                          for key, default in _PARAMS[kind].items()}
+                self._models[kind] = (cols, params)
+        self.reset()
+
+        groups = groups or {}
+        members = {}
+        for i, ch in enumerate(self.channels):
+            if ch.group is not None:
+                members.setdefault(ch.group, []).append(i)
+        members = {group: cols for group, cols in members.items() if len(cols) > 1}
+        self.group_names = tuple(members)
+        self.group_labels = tuple(f"{group.capitalize()} Redundancy" for group in self.group_names)
+        self.group_members = [np.array(cols, dtype=np.intp) for cols in members.values()]
+        self.group_tolerance = np.array([float(groups.get(group, {}).get("tolerance", 3.0))
+                                         for group in self.group_names])
+        # Spreads beyond tolerance are reported as the group's `status`.
+        self.group_status = tuple(groups.get(group, {}).get("status", "SENSOR MISMATCH")
+                                  for group in self.group_names)
+        for group, status in zip(self.group_names, self.group_status):
+            if status not in STATUS_CODES:
+                raise ValueError(f"group {group!r}: unknown status {status!r}")
+        # Groups of equal size are checked together as one (n, groups, size)
+        # gather, which reduces far faster than reduceat across the row.
+        sizes = {}
+        for g, cols in enumerate(self.group_members):
+            sizes.setdefault(len(cols), []).append(g)
+        self._group_sizes = [(np.array(gs, dtype=np.intp),
+                              np.array([self.group_members[g] for g in gs]))
+                             for gs in sizes.values()]
+
+    def __len__(self):
+        return len(self.channels)
+
+    def reset(self):
+        # Random walks restart from their configured start values.
+        if "random_walk" in self._models:
+            self._walk = self._models["random_walk"][1]["start"].copy()
+
+    @classmethod
+    def from_dict(cls, spec):
+        return cls([Channel(**ch) for ch in spec["channels"]],
+                   groups=spec.get("groups"), decimals=spec.get("decimals", 2))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            if path.endswith((".yaml", ".yml")):
+                import yaml
+                return cls.from_dict(yaml.safe_load(f))
+            return cls.from_dict(json.load(f))
+
+    def generate(self, rng, n):
+        values = np.empty((n, len(self.channels)))
+        for kind, (cols, p) in self._models.items():
+            k = len(cols)
+            if kind == "uniform":
+                values[:, cols] = rng.uniform(p["low"], p["high"], (n, k))
+            elif kind == "normal":
+                values[:, cols] = rng.normal(p["mean"], p["std"], (n, k))
+            elif kind == "constant":
+                values[:, cols] = p["value"]
+            else:
+                path = self._walk + np.cumsum(rng.normal(0.0, p["step"], (n, k)), axis=0)
+                np.clip(path, p["low"], p["high"], out=path)
+                values[:, cols] = path
+                self._walk = path[-1]
+        if self.decimals is not None:
+            np.round(values, self.decimals, out=values)
+        if self.dropout.any():
+            values[rng.random((n, len(self.channels))) < self.dropout] = np.nan
+        return values
+
+    def select(self, block, names):
+        # Named column views over a block's value matrix, for consumers
+        # that work channel by channel.
+        values = block["values"]
+        columns = {"timestamp": block["timestamp"]}
+        for name in names:
+            columns[name] = values[:, self.index[name]]
+        return columns
+
+    def limit_faults(self, values):
+        return (values < self.low_limit) | (values > self.high_limit)
+
+    def redundancy_faults(self, values):
+        spread = np.empty((len(values), len(self.group_members)))
+        for groups, cols in self._group_sizes:
+            grouped = values[:, cols]
+            spread[:, groups] = np.fmax.reduce(grouped, axis=2) - np.fmin.reduce(grouped, axis=2)
+        return spread > self.group_tolerance
+
+
+_PARAMS = {
+    "uniform": {"low": 0.0, "high": 1.0},
+    "normal": {"mean": 0.0, "std": 1.0},
+    "constant": {"value": 0.0},
+    "random_walk": {"start": 0.0, "step": 1.0, "low": -np.inf, "high": np.inf},
+}
+
+
+def default_schema():
+    return ChannelSchema.from_dict(DEFAULT_SCHEMA)
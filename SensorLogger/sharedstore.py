@@ -0,0 +1,173 @@
+import sys
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from .storage import ColumnStore, SENSOR_COLUMNS
+
+
+MAGIC = 0x53454E534F524C47
+# Header slots, one int64 each.
+_MAGIC, _CAPACITY, _ROW_BYTES, _SEQ, _TOTAL, _CLAIMED, _GENERATION = range(7)
+HEADER_SLOTS = 8
+
+
+def _open(name, size=0):
+    # Neither side owns the segment: it must outlive whichever process
+    # exits first, so it is kept away from the resource tracker, which
+    # would otherwise unlink it when its creator exits.
+    options = {"track": False} if sys.version_info >= (3, 13) else {}
+    shm = SharedMemory(name, create=size > 0, size=size, **options)
+    if sys.version_info < (3, 13):
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class SharedColumnStore(ColumnStore):
+    # A ColumnStore whose mirrored columns and counters live in one
+    # shared-memory segment, so acquisition and display can run in separate
+    # processes. The writer brackets every write with a sequence number
+    # (odd while writing) and publishes `claimed` before touching rows;
+    # readers either copy and validate (snapshot, read_since) or take
+    # zero-copy views and check intact() afterwards.
+    def __init__(self, shm, columns, capacity, readonly):
+        self.shm = shm
+        self.readonly = readonly
+        self.capacity = capacity
+        self.dtype = np.dtype(list(columns))
+        self.names = self.dtype.names
+        self._header = np.ndarray(HEADER_SLOTS, np.int64, buffer=shm.buf)
+        self._cols = {}
+        offset = self._header.nbytes
+        for name in self.names:
+            column = np.ndarray(2 * capacity, self.dtype[name], buffer=shm.buf, offset=offset)
+            column.flags.writeable = not readonly
+            self._cols[name] = column
+            offset += -(-column.nbytes // 8) * 8
+        self.spilled = 0
+        self.spill_path = None
+        self._spill = None
+
+    @staticmethod
+    def size_for(columns, capacity):
+        dtype = np.dtype(list(columns))
+        return HEADER_SLOTS * 8 + sum(-(-2 * capacity * dtype[name].itemsize // 8) * 8
+                                      for name in dtype.names)
+
+    @classmethod
+    def create(cls, name, columns=SENSOR_COLUMNS, capacity=1_000_000):
+        # A restarted writer adopts the existing ring and carries on from
+        # its total, so readers keep their cursors.
+        row_bytes = np.dtype(list(columns)).itemsize
+        try:
+            shm = _open(name)
+        except FileNotFoundError:
+            shm = _open(name, cls.size_for(columns, capacity))
+            header = np.ndarray(HEADER_SLOTS, np.int64, buffer=shm.buf)
+            header[:] = 0
+            header[_CAPACITY] = capacity
+            header[_ROW_BYTES] = row_bytes
+            header[_MAGIC] = MAGIC
+            del header
+            return cls(shm, columns, capacity, readonly=False)
+
+        store = cls._adopt(shm, columns)
+        if store.capacity != capacity:
+            store.close()
+            raise ValueError(f"shared ring {name!r} holds {store.capacity} rows, not {capacity}")
+        header = store._header
+        # A writer that died mid-write leaves an odd sequence number and
+        # rows claimed past the total; those rows were never published.
+        header[_CLAIMED] = header[_TOTAL]
+        header[_SEQ] += header[_SEQ] % 2
+        header[_GENERATION] += 1
+        return store
+
+    @classmethod
+    def attach(cls, name, columns=SENSOR_COLUMNS):
+        store = cls._adopt(_open(name), columns)
+        store._set_readonly()
+        return store
+
+    @classmethod
+    def _adopt(cls, shm, columns):
+        header = np.ndarray(HEADER_SLOTS, np.int64, buffer=shm.buf)
+        magic, capacity, row_bytes = (int(header[_MAGIC]), int(header[_CAPACITY]),
+                                      int(header[_ROW_BYTES]))
+        del header
+        if magic != MAGIC or row_bytes != np.dtype(list(columns)).itemsize:
+            shm.close()
+            raise ValueError(f"shared memory {shm.name!r} is not a ring with this layout")
+        return cls(shm, columns, capacity, readonly=False)
+
+    def _set_readonly(self):
+        self.readonly = True
+        for column in self._cols.values():
+            column.flags.writeable = False
+
+    @property
+    def total(self):
+        return int(self._header[_TOTAL])
+
+    @total.setter
+    def total(self, value):
+        self._header[_TOTAL] = value
+
+    @property
+    def claimed(self):
+        return int(self._header[_CLAIMED])
+
+    @claimed.setter
+    def claimed(self, value):
+        self._header[_CLAIMED] = value
+
+    @property
+    def seq(self):
+        return int(self._header[_SEQ])
+
+    @property
+    def generation(self):
+        return int(self._header[_GENERATION])
+
+    def append(self, *row):
+        self._header[_SEQ] += 1
+        try:
+            super().append(*row)
+        finally:
+            self._header[_SEQ] += 1
+
+    def extend(self, columns):
+        self._header[_SEQ] += 1
+        try:
+            super().extend(columns)
+        finally:
+            self._header[_SEQ] += 1
+
+    def intact(self, index):
+        # True while the rows from `index` on have not been overwritten;
+        # check after using zero-copy views.
+        return index >= self.claimed - self.capacity
+
+    def snapshot(self, n=None):
+        # Newest `n` rows as private copies, taken between two equal even
+        # sequence numbers so they come from one completed write.
+        while True:
+            seq = self.seq
+            if seq % 2:
+                time.sleep(0)
+                continue
+            block = {name: values.copy() for name, values in self.columns(n).items()}
+            if self.seq == seq:
+                return block
+
+    def close(self):
+        # Counters stay readable afterwards, frozen at their last values.
+        self._cols = {}
+        self._header = self._header.copy()
+        self.shm.close()
+
+    def unlink(self):
+        if sys.version_info < (3, 13):
+            # unlink() unregisters the name, so hand it back first.
+            resource_tracker.register(self.shm._name, "shared_memory")
+        self.shm.unlink()
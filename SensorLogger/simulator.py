@@ -0,0 +1,268 @@
+import os
+import time
+from threading import Event
+import numpy
+from .storage import ColumnStore, STATUS_CODES, STATUS_LABELS, sensor_columns
+from .rules import RuleSet
+from .schema import ChannelSchema, default_schema
+from .scheduler import RateScheduler
+from .sinks import (DEFAULT_FORMAT, make_sink, csv_columns, to_frame, arrow_schema,
+                    to_record_batch)
+from .stats import OnlineStats, RollingStats
+from .faults import FaultRegistry
+from .faultlog import DEFAULT_FAULT_LOG, make_fault_log
+
+# Spacing of generate_batch stamps when none are given: a nominal 1 MHz burst.
+SYNTHETIC_PERIOD_NS = 1_000
+# Seconds between checks for a resume while paused.
+PAUSE_POLL = 0.05
+
+
+class SensorSimulator:
+    def __init__(self, capacity=None, spill_path=None, seed=None,
+                 rate_hz=1.0, policy="catch_up", sinks=None, archive_format=DEFAULT_FORMAT,
+                 quantiles=(), max_error_log=10_000, error_spill_path=None,
+                 report_dir="reports", schema=None, shared=None, trend_window=100,
+                 fault_log=DEFAULT_FAULT_LOG):
+        self.running = Event()
+        self.paused = False
+        self.scheduler = RateScheduler(rate_hz, policy)
+        self._wake = Event()
+        self.report_dir = report_dir
+        if schema is None:
+            schema = default_schema()
+        elif isinstance(schema, str):
+            schema = ChannelSchema.load(schema)
+        self.schema = schema
+        if capacity is None:
+            # Same memory budget as the three-channel default of a million rows.
+            capacity = max(1_000, 3_000_000 // len(schema))
+        if shared:
+            # Rows go to a named shared-memory ring a GUI in another
+            # process can attach to.
+            from .sharedstore import SharedColumnStore
+            self.data = SharedColumnStore.create(shared, sensor_columns(len(schema)), capacity)
+        else:
+            self.data = ColumnStore(sensor_columns(len(schema)), capacity=capacity,
+                                    spill_path=spill_path)
+        if sinks is None:
+            sinks = [make_sink(self.data, archive_format,
+                               os.path.join(report_dir, "sensor_data_log"), schema=schema)]
+        self.sinks = sinks
+        self.stats = OnlineStats(schema.names, quantiles)
+        # Moving mean, volatility and trend over the last `trend_window` samples.
+        self.rolling = RollingStats(schema.names, trend_window)
+        # Faults stream to reports/sensor_error_log.jsonl (or `fault_log`, a
+        # format name or a FaultLog) as they happen; None keeps them in memory.
+        if isinstance(fault_log, str):
+            fault_log = make_fault_log(os.path.join(report_dir, "sensor_error_log"), fault_log)
+        self.fault_log = fault_log
+        self.faults = FaultRegistry(STATUS_LABELS, max_error_log, spill_path=error_spill_path,
+                                    stream=fault_log)
+        self.error_log = self.faults.log
+        # Fault sensors: one per channel (missing, out of limits, too fast
+        # or stuck), then one per redundancy group.
+        self._fault_ids = self.faults.sensor_ids(schema.labels + schema.group_labels)
+        self.rules = RuleSet(schema)
+        self.rng = numpy.random.default_rng(seed)
+        self._next_stamp = 0
+
+    def generate_batch(self, n, timestamps=None, monotonic=None, period_ns=SYNTHETIC_PERIOD_NS):
+        values = self.schema.generate(self.rng, n)
+        if timestamps is None:
+            # Synthetic batches are stamped `period_ns` apart from now, and
+            # never before the previous batch's stamps, so rows stay unique
+            # and in time order. Paced acquisition passes the scheduler's
+            # stamps instead; spacing a million-row batch one 1 Hz period
+            # apart would put it 11 days ahead of the clock.
+            start = max(time.time_ns(), self._next_stamp)
+            timestamps = start + numpy.arange(n, dtype=numpy.int64) * period_ns
+            self._next_stamp = start + n * period_ns
+        return self.process(timestamps, values, monotonic)
+
+    def process(self, timestamps, values, monotonic=None):
+        if monotonic is None:
+            # Sources without their own clock are mapped onto ours.
+            monotonic = timestamps - (time.time_ns() - time.monotonic_ns())
+        masks, faults, status = self.rules.evaluate(timestamps, values)
+        self.log_issues(timestamps, values, masks)
+
+        block = {"timestamp": timestamps, "monotonic": monotonic, "values": values,
+                 "status": status, "faults": faults}
+        self.data.extend(block)
+        self.stats.update_array(values)
+        self.rolling.update(timestamps, values)
+        self.faults.count_status(status)
+        for sink in self.sinks:
+            sink.notify()
+        return block
+
+    def log_issues(self, timestamps, values, masks):
+        stuck = masks["stuck"]
+        events = numpy.hstack([masks["missing"] | masks["limit"] | masks["rate"] | stuck,
+                               masks["redundancy"]])
+        self.faults.count_events(self._fault_ids, timestamps, events)
+
+        # nonzero() walks the mask row by row, so entries come out in sample
+        # order; only the entries the capped log will keep are built.
+        rows, sensors = numpy.nonzero(events)
+        if not rows.size:
+            return
+        keep = (rows.size if any(sink.records_faults for sink in self.sinks)
+                else self.faults.log_capacity(rows.size))
+        rows, sensors = rows[-keep:], sensors[-keep:]
+
+        channels = len(self.schema)
+        issues = numpy.empty(rows.size, dtype=object)
+        reading = sensors < channels
+        readings = values[rows[reading], sensors[reading]]
+        issues[reading] = numpy.where(numpy.isnan(readings), "No Data",
+                                      readings.astype(object))
+        # A reading inside its limits was flagged for its history instead.
+        quiet = reading.copy()
+        quiet[reading] = ~(masks["missing"] | masks["limit"])[rows[reading], sensors[reading]]
+        if quiet.any():
+            held = stuck[rows[quiet], sensors[quiet]]
+            readings = values[rows[quiet], sensors[quiet]].tolist()
+            issues[quiet] = [f"Stuck at {v}" if s else f"Jump to {v}"
+                             for v, s in zip(readings, held.tolist())]
+        # Redundancy issues list the group's readings, formatted a group at
+        # a time as string arrays rather than one join per entry.
+        group = sensors - channels
+        for g in numpy.unique(group[~reading]).tolist():
+            at = numpy.flatnonzero(group == g)
+            text = values[rows[at][:, None], self.schema.group_members[g]].astype(str)
+            joined = text[:, 0]
+            for column in text.T[1:]:
+                joined = numpy.char.add(numpy.char.add(joined, " vs "), column)
+            issues[at] = joined.tolist()
+        names = numpy.array(self.faults.sensors, dtype=object)[self._fault_ids[sensors]]
+        entries = list(zip(timestamps[rows].tolist(), names.tolist(), issues.tolist()))
+        self.faults.extend(entries)
+        for sink in self.sinks:
+            sink.write_faults(entries)
+
+    def generate_data(self):
+        block = self.generate_batch(1)
+        values = [None if numpy.isnan(v) else v for v in block["values"][0].tolist()]
+        return (block["timestamp"][0].item(), *values, STATUS_LABELS[block["status"][0]])
+
+    def query(self, start=None, end=None, channels=None, status=None, frame=False):
+        # Recorded rows with start <= timestamp <= end (epoch ns, either
+        # bound may be None), located by binary search. Columns are
+        # zero-copy views unless a status filter or a range spanning the
+        # spill file forces a copy. `channels` are schema names (default:
+        # all); `status` is a label, a code or a list of them.
+        block = self.data.query(start, end)
+        if channels is None:
+            channels = self.schema.names
+        elif isinstance(channels, str):
+            channels = [channels]
+        result = {"timestamp": block["timestamp"], "monotonic": block["monotonic"]}
+        result.update(self.schema.select(block, channels))
+        result["status"] = block["status"]
+        result["faults"] = block["faults"]
+        if status is not None:
+            wanted = [status] if isinstance(status, (str, int)) else status
+            codes = [STATUS_CODES[s] if isinstance(s, str) else s for s in wanted]
+            keep = numpy.isin(block["status"], codes)
+            result = {name: values[keep] for name, values in result.items()}
+        if not frame:
+            return result
+        import pandas as pd
+        result["timestamp"] = pd.to_datetime(result["timestamp"], unit="ns", utc=True)
+        result["status"] = numpy.asarray(STATUS_LABELS)[result["status"]]
+        return pd.DataFrame(result)
+
+    def export_range(self, path, start=None, end=None, chunk_rows=1_000_000):
+        # Rows in [start, end] to a .csv (same layout as the data log) or
+        # a .parquet file.
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        writer = None
+        try:
+            if path.endswith(".parquet"):
+                import pyarrow.parquet as pq
+                writer = pq.ParquetWriter(path, arrow_schema(self.schema), compression="zstd")
+            elif path.endswith(".csv"):
+                writer = open(path, "w", newline="")
+                writer.write(",".join(csv_columns(self.schema)) + "\n")
+            else:
+                raise ValueError(f"unsupported export format: {path}")
+            rows = 0
+            for block in self.data.query_blocks(start, end):
+                for at in range(0, len(block["timestamp"]), chunk_rows):
+                    chunk = {name: values[at:at + chunk_rows] for name, values in block.items()}
+                    if path.endswith(".parquet"):
+                        writer.write_batch(to_record_batch(chunk, self.schema))
+                    else:
+                        to_frame(chunk, self.schema).to_csv(writer, header=False, index=False,
+                                                            na_rep="--")
+                    rows += len(chunk["timestamp"])
+            return rows
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def start_logging(self):
+        self.running.set()
+        self._wake.clear()
+        self.scheduler.reset()
+        for sink in self.sinks:
+            sink.start()
+        while self.running.is_set():
+            delay = self.next_delay()
+            if delay is None:
+                self._wake.wait(PAUSE_POLL)
+            elif not self._wake.wait(delay):
+                timestamps = self.scheduler.take()
+                self.generate_batch(len(timestamps), timestamps,
+                                    self.scheduler.monotonic(timestamps))
+
+    def next_delay(self):
+        # Seconds until the next scheduled batch is due, or None while
+        # paused. The scheduler is re-anchored for as long as the pause
+        # lasts, so a resumed run does not catch up the paused time.
+        if self.paused:
+            self.scheduler.reset()
+            return None
+        return self.scheduler.delay()
+
+    def stop_logging(self):
+        self.running.clear()
+        self._wake.set()
+        for sink in self.sinks:
+            sink.notify(force=True)
+        if self.fault_log is not None:
+            self.fault_log.notify(force=True)
+
+    def export_data(self):
+        os.makedirs(self.report_dir, exist_ok=True)
+
+        # Sinks stream rows in the background; export only writes the tail.
+        for sink in self.sinks:
+            sink.finalize()
+
+        # The fault log is already on disk up to its last flush.
+        if self.fault_log is not None:
+            self.fault_log.flush()
+
+        summary = []
+
+        if self.stats.rows:
+            summary.append(f"Total Data Points: {self.stats.rows}")
+            for channel in self.schema.channels:
+                stats = self.stats.summary(channel.name)
+                line = (f"{channel.label:<11} -> Min: {stats['min']:.2f}, "
+                        f"Max: {stats['max']:.2f}, Mean: {stats['mean']:.2f}")
+                for p in self.stats.quantiles:
+                    key = f"p{p * 100:g}"
+                    line += f", {key.upper()}: {stats[key]:.2f}"
+                summary.append(line)
+            summary.append("")
+
+        summary.append("Error Type Breakdown:")
+        for sensor, count in self.faults.counts.items():
+            summary.append(f" - {sensor}: {count} occurrence(s)")
+
+        with open(os.path.join(self.report_dir, "report_summary.txt"), "w") as f:
+            f.write("\n".join(summary))
@@ -0,0 +1,585 @@
+import os
+import time
+from contextlib import closing
+from importlib.util import find_spec
+from threading import Thread, Event, Lock
+import numpy as np
+from .storage import STATUS_CODES, STATUS_LABELS, sensor_columns, time_slice
+from .schema import default_schema
+
+# pandas and pyarrow are imported where they are used so that headless
+# acquisition with the CSV-free sinks starts without paying for them.
+HAS_ARROW = find_spec("pyarrow") is not None
+
+
+# Text width of an ISO date and time at each datetime_as_string unit.
+TIME_WIDTHS = {"s": 19, "ms": 23, "us": 26, "ns": 29}
+QUARTER_HOUR_NS = 900 * 1_000_000_000
+DAY_NS = 86_400 * 1_000_000_000
+
+
+def utc_offsets(timestamps):
+    # Local UTC offset (ns) in effect at each epoch-ns timestamp, so a run
+    # that crosses a DST change, or an old log read today, keeps its own
+    # offsets. Zones change offset on quarter hours at most, so localtime()
+    # is asked once per quarter hour spanned, or just twice when the
+    # timestamps fall within a day and agree at both ends.
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if not timestamps.size:
+        return np.zeros(timestamps.shape, dtype=np.int64)
+    low, high = int(timestamps.min()), int(timestamps.max())
+    ends = [time.localtime(t // 1_000_000_000).tm_gmtoff for t in (low, high)]
+    if high - low <= DAY_NS and ends[0] == ends[1]:
+        return np.full(timestamps.shape, ends[0] * 1_000_000_000, dtype=np.int64)
+    quarters, inverse = np.unique(timestamps // QUARTER_HOUR_NS, return_inverse=True)
+    offsets = np.array([time.localtime(q * 900).tm_gmtoff for q in quarters.tolist()],
+                       dtype=np.int64) * 1_000_000_000
+    return offsets[inverse].reshape(timestamps.shape)
+
+
+def from_local(local):
+    # Epoch ns for local wall-clock times given as ns since the epoch. A
+    # time repeated when clocks go back maps to one of its two instants.
+    local = np.asarray(local, dtype=np.int64)
+    return local - utc_offsets(local - utc_offsets(local))
+
+
+def format_time(timestamps, unit="s", date=False):
+    # Local wall-clock text for epoch-ns timestamps, built in one pass over
+    # a fixed-width character array rather than one string per sample:
+    # "HH:MM:SS" for display, "YYYY-MM-DD HH:MM:SS.ffffff" (at `unit`
+    # precision) with `date` for exports.
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    local = timestamps + utc_offsets(timestamps)
+    width = TIME_WIDTHS[unit]
+    text = np.datetime_as_string(local.astype("datetime64[ns]"), unit=unit).astype(f"U{width}")
+    if not text.size:
+        return text
+    chars = text.reshape(-1).view("U1").reshape(-1, width)
+    if date:
+        chars[:, 10] = " "
+        return chars.view(f"U{width}").reshape(-1)
+    return np.ascontiguousarray(chars[:, 11:]).view(f"U{width - 11}").reshape(-1)
+
+
+def parse_time(text, day=None):
+    # Epoch nanoseconds from an integer, a local date and time, or a bare
+    # HH:MM[:SS] time of day taken on the (local) day of the `day` timestamp.
+    import pandas as pd
+    text = str(text).strip()
+    if text.lstrip("-").isdigit():
+        return int(text)
+    if day is not None and ":" in text and "-" not in text and " " not in text:
+        if text.count(":") == 1:
+            text += ":00"
+        midnight = (int(day) + int(utc_offsets([day])[0])) // DAY_NS * DAY_NS
+        return int(from_local([midnight + pd.Timedelta(text).value])[0])
+    stamp = pd.Timestamp(text)
+    return stamp.value if stamp.tzinfo is not None else int(from_local([stamp.value])[0])
+
+
+def csv_columns(schema):
+    return ("Time",) + schema.labels + ("Status",)
+
+
+def to_frame(block, schema):
+    import pandas as pd
+    columns = {"Time": format_time(block["timestamp"], "us", date=True)}
+    columns.update(zip(schema.labels, block["values"].T))
+    columns["Status"] = np.asarray(STATUS_LABELS)[block["status"]]
+    return pd.DataFrame(columns)
+
+
+def arrow_schema(schema):
+    import pyarrow as pa
+    return pa.schema(
+        [("timestamp", pa.timestamp("ns", tz="UTC")), ("monotonic", pa.int64())]
+        + [(name, pa.float64()) for name in schema.names]
+        + [("status", pa.dictionary(pa.int8(), pa.string())), ("faults", pa.uint8())])
+
+
+def to_record_batch(block, schema):
+    import pyarrow as pa
+    status = pa.DictionaryArray.from_arrays(
+        block["status"].astype(np.int8), pa.array(STATUS_LABELS))
+    # One transpose turns the row-major value matrix into contiguous columns.
+    channels = np.ascontiguousarray(block["values"].T)
+    return pa.record_batch(
+        [pa.array(block["timestamp"], pa.timestamp("ns", tz="UTC")),
+         pa.array(block["monotonic"], pa.int64())]
+        + [pa.array(values, from_pandas=True) for values in channels]
+        + [status, pa.array(block["faults"], pa.uint8())], schema=arrow_schema(schema))
+
+
+class StreamingSink:
+    # Set by sinks that also store fault log entries (see write_faults).
+    records_faults = False
+
+    def __init__(self, store, path, flush_interval=1.0, batch_size=10_000, schema=None):
+        self.store = store
+        self.path = path
+        self.schema = default_schema() if schema is None else schema
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        # A store adopted from an earlier run (a shared ring after a writer
+        # restart) already holds rows that were archived then.
+        self.cursor = store.total
+        self.written = 0
+        self.lost = 0
+        self._opened = False
+        self._lock = Lock()
+        self._wake = Event()
+        self._stop = Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def notify(self, force=False):
+        pending = self.store.total - self.cursor
+        if force or pending >= min(self.batch_size, self.store.capacity // 2):
+            self._wake.set()
+
+    def flush(self):
+        with self._lock:
+            if not self._opened:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self.open()
+                self._opened = True
+            while self.cursor < self.store.total:
+                start, block = self.store.read_since(self.cursor, self.batch_size, copy=True)
+                self.lost += start - self.cursor
+                count = len(block["timestamp"])
+                self.write_block(block)
+                self.cursor = start + count
+                self.written += count
+            self.sync()
+
+    def finalize(self):
+        self.flush()
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        with self._lock:
+            self.finish()
+            self._opened = False
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def open(self):
+        raise NotImplementedError
+
+    def write_block(self, block):
+        raise NotImplementedError
+
+    def sync(self):
+        pass
+
+    def finish(self):
+        pass
+
+    def write_faults(self, entries):
+        pass
+
+
+class CsvSink(StreamingSink):
+    def open(self):
+        self._file = open(self.path, "a" if self.written else "w", newline="")
+        if not self.written:
+            self._file.write(",".join(csv_columns(self.schema)) + "\n")
+
+    def write_block(self, block):
+        to_frame(block, self.schema).to_csv(self._file, header=False, index=False, na_rep="--")
+
+    def sync(self):
+        self._file.flush()
+
+    def finish(self):
+        self._file.close()
+
+
+class RowGroupSink(StreamingSink):
+    # Columnar formats are written as parts inside a directory. Rows are
+    # buffered into row groups of `row_group_size`; only the last group of
+    # a part may be smaller. A part only becomes readable once its footer
+    # is written, so parts are closed every `part_rows` rows or
+    # `part_interval` seconds, and by finalize(): a crash loses at most the
+    # open part. Until then it has a hidden name that readers skip.
+    extension = None
+
+    def __init__(self, store, path, flush_interval=1.0, batch_size=10_000,
+                 row_group_size=100_000, part_rows=1_000_000, part_interval=60.0, schema=None):
+        if not HAS_ARROW:
+            raise ImportError(f"{type(self).__name__} requires pyarrow")
+        super().__init__(store, path, flush_interval, batch_size, schema)
+        self.row_group_size = row_group_size
+        self.part_rows = part_rows
+        self.part_interval = part_interval
+        self.parts = 0
+        self._writer = None
+        self._part_rows = 0
+        self._part_opened = 0.0
+        self._pending = []
+        self._pending_rows = 0
+
+    def open(self):
+        os.makedirs(self.path, exist_ok=True)
+        if not self.written:
+            # A new run numbers its parts from 0 again, so parts left by an
+            # earlier run are removed rather than partly overwritten.
+            for name in os.listdir(self.path):
+                if name.lstrip(".").startswith("part-") and name.endswith(self.extension):
+                    os.remove(os.path.join(self.path, name))
+
+    def write_block(self, block):
+        # Arrow wraps NumPy buffers without copying; flush() hands sinks
+        # private copies, so buffering them until the row group is written is safe.
+        batch = to_record_batch(block, self.schema)
+        if self._writer is None and not self._pending:
+            self._part_opened = time.monotonic()
+        self._pending.append(batch)
+        self._pending_rows += batch.num_rows
+        if self._pending_rows >= self.row_group_size:
+            self._write_pending(whole_groups=True)
+
+    def sync(self):
+        if (self._writer is not None or self._pending) and (
+                self._part_rows + self._pending_rows >= self.part_rows
+                or time.monotonic() - self._part_opened >= self.part_interval):
+            self._close_part()
+
+    def finalize(self):
+        self.flush()
+        with self._lock:
+            self._close_part()
+
+    def finish(self):
+        self._close_part()
+
+    def _part_path(self, hidden=False):
+        name = f"part-{self.parts:05d}{self.extension}"
+        return os.path.join(self.path, "." + name if hidden else name)
+
+    def _write_pending(self, whole_groups=False):
+        if not self._pending:
+            return
+        import pyarrow as pa
+        table = pa.Table.from_batches(self._pending)
+        rows = table.num_rows
+        if whole_groups:
+            # The remainder waits for the next group or the end of the part.
+            rows -= rows % self.row_group_size
+        if self._writer is None:
+            self._writer = self.new_writer(self._part_path(hidden=True))
+        self.write_table(table.slice(0, rows))
+        self._part_rows += rows
+        self._pending_rows = table.num_rows - rows
+        self._pending = table.slice(rows).to_batches() if self._pending_rows else []
+
+    def _close_part(self):
+        self._write_pending()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            os.replace(self._part_path(hidden=True), self._part_path())
+            self.parts += 1
+            self._part_rows = 0
+
+
+class ParquetSink(RowGroupSink):
+    extension = ".parquet"
+
+    def __init__(self, store, path, flush_interval=1.0, batch_size=10_000,
+                 row_group_size=100_000, part_rows=1_000_000, part_interval=60.0,
+                 compression="zstd", schema=None):
+        super().__init__(store, path, flush_interval, batch_size, row_group_size, part_rows,
+                         part_interval, schema)
+        self.compression = compression
+
+    def new_writer(self, part):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(part, arrow_schema(self.schema), compression=self.compression,
+                                use_dictionary=["status"])
+
+    def write_table(self, table):
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+
+
+class ArrowSink(RowGroupSink):
+    # Uncompressed by default so pyarrow can memory-map parts and hand
+    # pandas zero-copy columns; pass compression="zstd" to trade that for size.
+    extension = ".arrow"
+
+    def __init__(self, store, path, flush_interval=1.0, batch_size=10_000,
+                 row_group_size=100_000, part_rows=1_000_000, part_interval=60.0,
+                 compression=None, schema=None):
+        super().__init__(store, path, flush_interval, batch_size, row_group_size, part_rows,
+                         part_interval, schema)
+        self.compression = compression
+
+    def new_writer(self, part):
+        import pyarrow as pa
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        return pa.ipc.new_file(part, arrow_schema(self.schema), options=options)
+
+    def write_table(self, table):
+        self._writer.write_table(table, max_chunksize=self.row_group_size)
+
+
+class BinaryLogSink(StreamingSink):
+    # Native block-indexed log (see binlog.py): records are written as they
+    # are, so this is the cheapest sink and the file can be read while open.
+    def __init__(self, store, path, flush_interval=1.0, batch_size=10_000,
+                 block_rows=65_536, schema=None):
+        super().__init__(store, path, flush_interval, batch_size, schema)
+        self.block_rows = block_rows
+
+    def open(self):
+        from .binlog import BinaryLogWriter
+        self._writer = BinaryLogWriter(self.path, self.schema, self.block_rows)
+
+    def write_block(self, block):
+        self._writer.write(block)
+
+    def sync(self):
+        self._writer.flush()
+
+    def finish(self):
+        self._writer.close()
+
+
+class SqliteSink(StreamingSink):
+    # A `samples` table (one REAL column per channel, NULL for a missing
+    # reading; status and faults codes, with labels in `status_labels`) and
+    # a `faults` table fed from the fault log, for tools that query runs
+    # with SQL. Rows are inserted with executemany from the writer thread
+    # and each flush is one transaction, so batch_size and flush_interval
+    # bound its size and latency (`transaction_rows` caps it). WAL mode
+    # lets readers query the file while it is written.
+    records_faults = True
+
+    def __init__(self, store, path, flush_interval=1.0, batch_size=10_000,
+                 transaction_rows=200_000, schema=None):
+        super().__init__(store, path, flush_interval, batch_size, schema)
+        self.transaction_rows = transaction_rows
+        self.faults_written = 0
+        self._faults = []
+        self._faults_lock = Lock()
+        self._conn = None
+        self._pending_rows = 0
+
+    def write_faults(self, entries):
+        # Called on the acquisition thread: entries are only queued here.
+        with self._faults_lock:
+            self._faults.extend(entries)
+
+    def open(self):
+        import sqlite3
+        if not self.written:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(self.path + suffix):
+                    os.remove(self.path + suffix)
+        self._conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        channels = "".join(f", {_sql_name(name)} REAL" for name in self.schema.names)
+        self._conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS samples (
+                timestamp INTEGER NOT NULL, monotonic INTEGER{channels},
+                status INTEGER NOT NULL, faults INTEGER NOT NULL);
+            CREATE INDEX IF NOT EXISTS samples_timestamp ON samples (timestamp);
+            CREATE INDEX IF NOT EXISTS samples_status ON samples (status);
+            CREATE TABLE IF NOT EXISTS faults (timestamp INTEGER NOT NULL, sensor TEXT, issue);
+            CREATE INDEX IF NOT EXISTS faults_timestamp ON faults (timestamp);
+            CREATE TABLE IF NOT EXISTS status_labels (code INTEGER PRIMARY KEY, label TEXT);
+            CREATE TABLE IF NOT EXISTS channels (
+                name TEXT PRIMARY KEY, label TEXT, units TEXT, position INTEGER);
+        """)
+        self._conn.executemany("INSERT OR REPLACE INTO status_labels VALUES (?, ?)",
+                               enumerate(STATUS_LABELS))
+        self._conn.executemany("INSERT OR REPLACE INTO channels VALUES (?, ?, ?, ?)",
+                               [(ch.name, ch.label, ch.units, i)
+                                for i, ch in enumerate(self.schema.channels)])
+        self._insert = f"INSERT INTO samples VALUES ({', '.join(['?'] * (len(self.schema) + 4))})"
+
+    def write_block(self, block):
+        self._begin()
+        # Per-column tolist() then zip builds the row tuples at C speed.
+        self._conn.executemany(self._insert, zip(
+            block["timestamp"].tolist(), block["monotonic"].tolist(),
+            *block["values"].T.tolist(), block["status"].tolist(), block["faults"].tolist()))
+        self._pending_rows += len(block["timestamp"])
+        if self._pending_rows >= self.transaction_rows:
+            self._commit()
+
+    def sync(self):
+        with self._faults_lock:
+            entries, self._faults = self._faults, []
+        if entries:
+            self._begin()
+            self._conn.executemany("INSERT INTO faults VALUES (?, ?, ?)", entries)
+            self.faults_written += len(entries)
+        self._commit()
+
+    def finish(self):
+        self.sync()
+        self._conn.close()
+        self._conn = None
+
+    def _begin(self):
+        if not self._conn.in_transaction:
+            self._conn.execute("BEGIN")
+
+    def _commit(self):
+        if self._conn.in_transaction:
+            self._conn.execute("COMMIT")
+        self._pending_rows = 0
+
+
+def _sql_name(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+FORMATS = {
+    "csv": (CsvSink, ".csv"),
+    "parquet": (ParquetSink, ".parquet"),
+    "arrow": (ArrowSink, ".arrow"),
+    "slog": (BinaryLogSink, ".slog"),
+    "sqlite": (SqliteSink, ".sqlite"),
+}
+DEFAULT_FORMAT = "parquet" if HAS_ARROW else "csv"
+
+
+def make_sink(store, fmt=DEFAULT_FORMAT, base="reports/sensor_data_log", **options):
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format {fmt!r}, expected one of {sorted(FORMATS)}")
+    cls, extension = FORMATS[fmt]
+    return cls(store, base + extension, **options)
+
+
+def read_blocks(path, chunk_rows=100_000, schema=None, start=None, end=None):
+    # Yields recorded logs back as column blocks, one chunk at a time,
+    # optionally limited to rows with epoch-ns start <= timestamp <= end.
+    # Nothing is read ahead, so the first block of a large log arrives at once.
+    schema = default_schema() if schema is None else schema
+    if path.endswith(".csv"):
+        for block in _read_csv_blocks(path, chunk_rows, schema):
+            rows = time_slice(block["timestamp"], start, end)
+            if rows.stop > rows.start:
+                yield {name: values[rows] for name, values in block.items()}
+    elif path.endswith(".parquet") or path.endswith(".arrow"):
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        dataset = ds.dataset(path, format="parquet" if path.endswith(".parquet") else "ipc")
+        # Parquet row groups outside the range are skipped on their statistics.
+        field, unit = ds.field("timestamp"), pa.timestamp("ns", tz="UTC")
+        where = None
+        if start is not None:
+            where = field >= pa.scalar(start, unit)
+        if end is not None:
+            before = field <= pa.scalar(end, unit)
+            where = before if where is None else where & before
+        for batch in dataset.to_batches(batch_size=chunk_rows, filter=where):
+            if batch.num_rows:
+                yield _batch_to_block(batch, schema)
+    elif path.endswith(".slog"):
+        from .binlog import BinaryLog
+        yield from BinaryLog(path).blocks(start, end, chunk_rows)
+    elif path.endswith(".sqlite"):
+        yield from _read_sqlite_blocks(path, chunk_rows, schema, start, end)
+    elif path.endswith(".bin"):
+        rows = np.memmap(path, dtype=np.dtype(sensor_columns(len(schema))), mode="r")
+        span = time_slice(rows["timestamp"], start, end)
+        for at in range(span.start, span.stop, chunk_rows):
+            chunk = rows[at:min(at + chunk_rows, span.stop)]
+            yield {name: chunk[name] for name in chunk.dtype.names}
+    else:
+        raise ValueError(f"unsupported log format: {path}")
+
+
+def _read_sqlite_blocks(path, chunk_rows, schema, start, end):
+    import sqlite3
+    import pandas as pd
+    # The timestamp index turns the range into a seek plus an ordered scan.
+    where = " AND ".join(clause for clause, bound in (("timestamp >= ?", start),
+                                                      ("timestamp <= ?", end))
+                         if bound is not None)
+    sql = (f"SELECT timestamp, monotonic, {', '.join(map(_sql_name, schema.names))}, "
+           f"status, faults FROM samples {'WHERE ' + where if where else ''} ORDER BY timestamp")
+    params = [int(bound) for bound in (start, end) if bound is not None]
+    with closing(sqlite3.connect(path)) as conn:
+        for frame in pd.read_sql_query(sql, conn, params=params, chunksize=chunk_rows):
+            yield {
+                "timestamp": frame["timestamp"].to_numpy(np.int64),
+                "monotonic": frame["monotonic"].to_numpy(np.int64),
+                "values": frame[list(schema.names)].to_numpy(np.float64),
+                "status": frame["status"].to_numpy(np.uint8),
+                "faults": frame["faults"].to_numpy(np.uint8),
+            }
+
+
+def _read_csv_blocks(path, chunk_rows, schema):
+    import pandas as pd
+    # Older CSV logs only carry wall-clock time of day, so their rows are
+    # placed on the file's modification date and a backwards step is read
+    # as midnight.
+    midnight = pd.Timestamp(time.strftime("%Y-%m-%d", time.localtime(os.path.getmtime(path))))
+    day, previous = 0, None
+    for frame in pd.read_csv(path, chunksize=chunk_rows, na_values=["--"]):
+        text = frame["Time"].to_numpy(str)
+        if "-" in text[0]:
+            timestamps = from_local(text.astype("datetime64[ns]").astype(np.int64))
+        else:
+            parts = frame["Time"].str.split(":", expand=True).astype(np.int64).to_numpy()
+            seconds = parts @ np.array([3600, 60, 1])
+            steps = np.diff(seconds, prepend=seconds[0] if previous is None else previous) < 0
+            days = day + np.cumsum(steps)
+            day, previous = int(days[-1]), seconds[-1]
+            timestamps = from_local(midnight.value + (days * 86_400 + seconds) * 1_000_000_000)
+        status = pd.Categorical(frame["Status"], categories=STATUS_LABELS).codes
+        codes = np.where(status >= 0, status, 0).astype(np.uint8)
+        yield {
+            "timestamp": timestamps,
+            "values": frame[list(schema.labels)].to_numpy(np.float64),
+            "status": codes,
+        }
+
+
+def _batch_to_block(batch, schema):
+    import pyarrow as pa
+    status = batch.column("status")
+    if pa.types.is_dictionary(status.type):
+        lookup = np.array([STATUS_CODES.get(label, 0) for label in status.dictionary.to_pylist()],
+                          dtype=np.uint8)
+        codes = lookup[status.indices.to_numpy(zero_copy_only=False)]
+    else:
+        codes = np.array([STATUS_CODES.get(label, 0) for label in status.to_pylist()],
+                         dtype=np.uint8)
+    values = np.empty((batch.num_rows, len(schema)))
+    for i, name in enumerate(schema.names):
+        values[:, i] = batch.column(name).to_numpy(zero_copy_only=False)
+    block = {
+        "timestamp": batch.column("timestamp").cast(pa.int64()).to_numpy(),
+        "values": values,
+        "status": codes,
+    }
+    # Logs written before the monotonic and faults columns existed leave
+    # them to the reader.
+    if "monotonic" in batch.schema.names:
+        block["monotonic"] = batch.column("monotonic").to_numpy()
+    if "faults" in batch.schema.names:
+        block["faults"] = batch.column("faults").to_numpy()
+    return block
@@ -0,0 +1,308 @@
+import numpy as np
+
+
+class P2Quantile:
+    # Jain & Chlamtac P-square estimator: five markers, O(1) memory per quantile.
+    def __init__(self, p):
+        self.p = p
+        self._initial = []
+        self._q = None
+        self._n = [0, 1, 2, 3, 4]
+        self._desired = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+        self._step = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def update(self, x):
+        if self._q is None:
+            self._initial.append(x)
+            if len(self._initial) == 5:
+                self._q = sorted(self._initial)
+            return
+
+        q, n = self._q, self._n
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._step[i]
+
+        for i in (1, 2, 3):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                candidate = self._parabolic(i, d)
+                if not q[i - 1] < candidate < q[i + 1]:
+                    candidate = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = candidate
+                n[i] += d
+
+    def value(self):
+        if self._q is not None:
+            return self._q[2]
+        if not self._initial:
+            return float("nan")
+        return float(np.quantile(self._initial, self.p))
+
+    def _parabolic(self, i, d):
+        q, n = self._q, self._n
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+
+class OnlineStats:
+    # Per-column count, mean, variance (Welford, merged per batch with
+    # Chan's update), min and max. NaN readings are not counted.
+    def __init__(self, names, quantiles=()):
+        self.names = tuple(names)
+        size = len(self.names)
+        self.rows = 0
+        self.count = np.zeros(size, dtype=np.int64)
+        self.mean = np.zeros(size)
+        self.min = np.full(size, np.inf)
+        self.max = np.full(size, -np.inf)
+        self._m2 = np.zeros(size)
+        self.quantiles = tuple(quantiles)
+        self._estimators = [[P2Quantile(p) for p in self.quantiles] for _ in self.names]
+
+    def update(self, block):
+        self.update_array(np.column_stack([block[name] for name in self.names]))
+
+    def update_array(self, values):
+        rows = len(values)
+        if not rows:
+            return
+        self.rows += rows
+        valid = ~np.isnan(values)
+        count = valid.sum(axis=0)
+        seen = count > 0
+        if not seen.any():
+            return
+
+        filled = np.where(valid, values, 0.0)
+        mean = np.divide(filled.sum(axis=0), count, out=np.zeros_like(self.mean), where=seen)
+        m2 = (np.where(valid, values - mean, 0.0) ** 2).sum(axis=0)
+        self.min = np.fmin(self.min, np.where(valid, values, np.inf).min(axis=0))
+        self.max = np.fmax(self.max, np.where(valid, values, -np.inf).max(axis=0))
+
+        total = self.count + count
+        delta = mean - self.mean
+        safe = np.maximum(total, 1)
+        self.mean = np.where(seen, self.mean + delta * count / safe, self.mean)
+        self._m2 = np.where(seen, self._m2 + m2 + delta ** 2 * self.count * count / safe, self._m2)
+        self.count = total
+
+        if self.quantiles:
+            for column, estimators in enumerate(self._estimators):
+                for x in values[valid[:, column], column].tolist():
+                    for estimator in estimators:
+                        estimator.update(x)
+
+    def merge(self, other):
+        # Chan's pairwise update, for combining statistics gathered in
+        # separate processes. P-square markers cannot be combined.
+        if self.quantiles or other.quantiles:
+            raise ValueError("quantile estimators cannot be merged")
+        if other.names != self.names:
+            raise ValueError("statistics cover different columns")
+        self.rows += other.rows
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        safe = np.maximum(total, 1)
+        self.mean = self.mean + delta * other.count / safe
+        self._m2 = self._m2 + other._m2 + delta ** 2 * self.count * other.count / safe
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        self.count = total
+
+    def variance(self):
+        return np.divide(self._m2, self.count - 1, out=np.full_like(self._m2, np.nan),
+                         where=self.count > 1)
+
+    def std(self):
+        return np.sqrt(self.variance())
+
+    def summary(self, name):
+        i = self.names.index(name)
+        result = {
+            "count": int(self.count[i]),
+            "mean": float(self.mean[i]) if self.count[i] else float("nan"),
+            "std": float(self.std()[i]),
+            "min": float(self.min[i]),
+            "max": float(self.max[i]),
+        }
+        for p, estimator in zip(self.quantiles, self._estimators[i]):
+            result[f"p{p * 100:g}"] = estimator.value()
+        return result
+
+
+class RollingStats:
+    # Moving mean, standard deviation and least-squares slope over the last
+    # `window` samples of every column, plus an EWMA. Running weighted sums
+    # (weight 0 for NaN readings) are kept in the window's slot coordinates,
+    # so a block of m samples updates them in O(m) whatever the window size:
+    # evicted slots are subtracted, the rest shift down by m and the new
+    # slots are added. Values are shifted by each column's first reading to
+    # keep the sums well conditioned, and rebuilt exactly every
+    # `rebuild_every` windows to stop rounding drift.
+    def __init__(self, names, window=100, alpha=None, threshold=1.0, significance=2.0,
+                 rebuild_every=64):
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        self.names = tuple(names)
+        self.window = window
+        # Same centre of mass as the moving average by default.
+        self.alpha = 2 / (window + 1) if alpha is None else alpha
+        self.threshold = threshold
+        self.significance = significance
+        # Readings older than this many valid samples weigh < 1e-18 in the EWMA.
+        self._horizon = int(np.ceil(np.log(1e-18) / np.log1p(-self.alpha))) if self.alpha < 1 else 1
+        self.rebuild_every = rebuild_every
+        size = len(self.names)
+        self.ewma = np.full(size, np.nan)
+        self._shift = np.full(size, np.nan)
+        self._y = np.zeros((window, size))
+        self._w = np.zeros((window, size))
+        self._t = np.zeros(window, dtype=np.int64)
+        self._pos = 0
+        self._filled = 0
+        self._since_rebuild = 0
+        self._sums = np.zeros((6, size))
+
+    def update(self, timestamps, values):
+        rows = len(values)
+        if not rows:
+            return
+        valid = ~np.isnan(values)
+        self._update_ewma(values, valid)
+        first = valid.argmax(axis=0)
+        unset = np.isnan(self._shift) & valid.any(axis=0)
+        self._shift[unset] = values[first[unset], unset]
+
+        W = self.window
+        if rows >= W:
+            values, valid = values[-W:], valid[-W:]
+            self._y[:] = np.where(valid, values - np.nan_to_num(self._shift), 0.0)
+            self._w[:], self._t[:] = valid, timestamps[-W:]
+            self._pos, self._filled = 0, W
+            self._rebuild()
+            return
+
+        y = np.where(valid, values - np.nan_to_num(self._shift), 0.0)
+        w = valid.astype(np.float64)
+
+        slots = (self._pos + np.arange(rows)) % W
+        old = np.arange(rows, dtype=np.float64)[:, None]
+        new = W - rows + old
+        n, s, q, sx, sxx, sxy = self._sums - self._moments(self._w[slots], self._y[slots], old)
+        # Remaining samples move from slot index i to i - rows.
+        sxx = sxx - 2 * rows * sx + rows * rows * n
+        sxy = sxy - rows * s
+        sx = sx - rows * n
+        self._sums = np.array([n, s, q, sx, sxx, sxy]) + self._moments(w, y, new)
+        self._y[slots], self._w[slots], self._t[slots] = y, w, timestamps
+        self._pos = (self._pos + rows) % W
+        self._filled = min(W, self._filled + rows)
+        self._since_rebuild += rows
+        if self._since_rebuild >= self.rebuild_every * W:
+            self._rebuild()
+
+    @staticmethod
+    def _moments(w, y, x):
+        wy = w * y
+        return np.array([w.sum(axis=0), wy.sum(axis=0), (wy * y).sum(axis=0),
+                         (w * x).sum(axis=0), (w * x * x).sum(axis=0), (wy * x).sum(axis=0)])
+
+    def _rebuild(self):
+        order = (self._pos + np.arange(self.window)) % self.window
+        x = np.arange(self.window, dtype=np.float64)[:, None]
+        self._sums = self._moments(self._w[order], self._y[order], x)
+        self._since_rebuild = 0
+
+    def _update_ewma(self, values, valid):
+        # Closed form of e = a*y + (1 - a)*e over the block; NaN readings
+        # leave the average where it was.
+        keep = 1.0 - self.alpha
+        unset = np.isnan(self.ewma) & valid.any(axis=0)
+        self.ewma[unset] = values[valid.argmax(axis=0)[unset], unset]
+        tail = 2 * self._horizon
+        if len(values) > tail and valid[-tail:].sum(axis=0).min() >= self._horizon:
+            values, valid = values[-tail:], valid[-tail:]
+        after = valid[::-1].cumsum(axis=0)[::-1] - valid
+        # exp() of a product is several times cheaper than a power per element.
+        decayed = np.where(valid, values, 0.0) * np.exp(after * np.log(keep))
+        self.ewma = keep ** valid.sum(axis=0) * self.ewma + self.alpha * decayed.sum(axis=0)
+
+    def count(self):
+        return self._sums[0].astype(np.int64)
+
+    def mean(self):
+        n, s = self._sums[0], self._sums[1]
+        return self._shift + np.divide(s, n, out=np.full_like(n, np.nan), where=n > 0)
+
+    def std(self):
+        n, s, q = self._sums[:3]
+        m2 = np.maximum(q - np.divide(s * s, n, out=np.zeros_like(n), where=n > 0), 0.0)
+        return np.sqrt(np.divide(m2, n - 1, out=np.full_like(n, np.nan), where=n > 1))
+
+    def slope(self):
+        # Least-squares slope in units per sample.
+        n, s, _, sx, sxx, sxy = self._sums
+        det = n * sxx - sx * sx
+        return np.divide(n * sxy - sx * s, det, out=np.full_like(n, np.nan), where=det > 0)
+
+    def slope_t(self):
+        # Slope over its standard error; noise alone rarely exceeds 2.
+        n, s, q, sx, sxx, sxy = self._sums
+        safe = np.maximum(n, 1)
+        xx = sxx - sx * sx / safe
+        xy = sxy - sx * s / safe
+        yy = q - s * s / safe
+        ok = (n > 2) & (xx > 0)
+        resid = np.divide(np.maximum(yy - np.divide(xy * xy, xx, out=np.zeros_like(xx), where=ok),
+                                     0.0), n - 2, out=np.zeros_like(n), where=ok)
+        error = np.sqrt(np.divide(resid, xx, out=np.zeros_like(xx), where=ok))
+        return np.divide(xy, xx * error, out=np.full_like(n, np.nan), where=ok & (error > 0))
+
+    def period(self):
+        # Mean sample spacing across the window, in seconds.
+        if self._filled < 2:
+            return float("nan")
+        oldest = self._t[self._pos % self.window if self._filled == self.window else 0]
+        newest = self._t[(self._pos - 1) % self.window]
+        return (int(newest) - int(oldest)) / 1e9 / (self._filled - 1)
+
+    def rate(self):
+        # Rate of change in units per second.
+        period = self.period()
+        return self.slope() / period if period > 0 else np.full(len(self.names), np.nan)
+
+    def trend(self):
+        # Rising or Falling when the fitted line moves more than
+        # `threshold` across the window and the slope stands out from the
+        # noise by `significance` standard errors.
+        change = self.slope() * (self._filled - 1)
+        strong = np.abs(self.slope_t()) >= self.significance
+        return ["--" if np.isnan(c) else "Stable" if not sure
+                else "Rising" if c > self.threshold
+                else "Falling" if c < -self.threshold else "Stable"
+                for c, sure in zip(change.tolist(), strong.tolist())]
+
+    def summary(self, name):
+        i = self.names.index(name)
+        return {
+            "mean": float(self.mean()[i]),
+            "std": float(self.std()[i]),
+            "ewma": float(self.ewma[i]),
+            "slope": float(self.slope()[i]),
+            "rate": float(self.rate()[i]),
+            "trend": self.trend()[i],
+        }
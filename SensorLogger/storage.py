@@ -0,0 +1,209 @@
+import bisect
+import os
+import numpy as np
+
+
+STATUS_LABELS = ("OK", "TEMP SENSOR FAIL", "TEMP SENSOR MISMATCH", "PRESSURE FAULT",
+                 "LIMIT FAULT", "RATE FAULT", "STUCK SENSOR", "SENSOR FAIL", "SENSOR MISMATCH")
+STATUS_CODES = {label: code for code, label in enumerate(STATUS_LABELS)}
+
+
+def sensor_columns(channels):
+    # One row per sample; channel readings share a single (channels,) column
+    # so a batch for any number of channels is one contiguous matrix.
+    # `timestamp` is wall-clock epoch-ns for ordering and display;
+    # `monotonic` is the host's monotonic clock in ns, for interval math
+    # that must not jump when the wall clock is stepped. `status` is the
+    # most severe fault of the sample, `faults` a bitmask of every rule
+    # kind that fired (see rules.py).
+    return [
+        ("timestamp", np.int64),
+        ("monotonic", np.int64),
+        ("values", np.float64, (channels,)),
+        ("status", np.uint8),
+        ("faults", np.uint8),
+    ]
+
+
+SENSOR_COLUMNS = sensor_columns(3)
+
+
+def time_slice(timestamps, start=None, end=None):
+    # Rows with start <= timestamp <= end of a sorted column, by binary
+    # search; either bound may be None. A strided column (one field of a
+    # memory-mapped record file) is bisected in place, because
+    # np.searchsorted would first copy all of it.
+    search = np.searchsorted if timestamps.flags.c_contiguous else _bisect
+    lo = 0 if start is None else int(search(timestamps, start, "left"))
+    hi = len(timestamps) if end is None else int(search(timestamps, end, "right"))
+    return slice(lo, max(lo, hi))
+
+
+def _bisect(values, value, side):
+    return (bisect.bisect_left if side == "left" else bisect.bisect_right)(values, value)
+
+
+class ColumnStore:
+    def __init__(self, columns=SENSOR_COLUMNS, capacity=1_000_000, spill_path=None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.dtype = np.dtype(list(columns))
+        self.names = self.dtype.names
+        # Every row is written twice, `capacity` slots apart, so the newest
+        # rows always form one contiguous slice and reads are plain views.
+        self._cols = {name: np.zeros(2 * capacity, self.dtype[name])
+                      for name in self.names}
+        self.total = 0
+        # Rows up to `claimed` may be mid-write; readers copying from the
+        # ring check it afterwards to detect rows overwritten under them.
+        self.claimed = 0
+        self.spilled = 0
+        self.spill_path = spill_path
+        self._spill = None
+        if spill_path:
+            os.makedirs(os.path.dirname(spill_path) or ".", exist_ok=True)
+            self._spill = open(spill_path, "wb")
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def __getitem__(self, name):
+        return self.view(name)
+
+    @property
+    def first(self):
+        return self.total - len(self)
+
+    def append(self, *row):
+        cap = self.capacity
+        pos = self.total % cap
+        if self.total >= cap and self._spill is not None:
+            self._spill_rows(pos, 1)
+        self.claimed = self.total + 1
+        for name, value in zip(self.names, row):
+            col = self._cols[name]
+            col[pos] = value
+            col[pos + cap] = value
+        self.total += 1
+
+    def extend(self, columns):
+        cap = self.capacity
+        n = len(columns[self.names[0]])
+        if n == 0:
+            return
+        skip = max(0, n - cap)
+        if self._spill is not None:
+            evicted = min(len(self), len(self) + n - cap)
+            if evicted > 0:
+                self._spill_rows(self.first % cap, evicted)
+            if skip:
+                self._spill_block({name: columns[name][:skip] for name in self.names})
+
+        self.claimed = self.total + n
+        pos = (self.total + skip) % cap
+        count = n - skip
+        head = min(count, cap - pos)
+        for name in self.names:
+            values = columns[name][skip:]
+            col = self._cols[name]
+            col[pos:pos + count] = values
+            col[pos + cap:pos + cap + head] = values[:head]
+            col[:count - head] = values[head:]
+        self.total += n
+
+    def view(self, name, n=None):
+        size = len(self) if n is None else min(n, len(self))
+        start = (self.total - size) % self.capacity
+        return self._cols[name][start:start + size]
+
+    def columns(self, n=None):
+        return {name: self.view(name, n) for name in self.names}
+
+    def last(self):
+        if not self.total:
+            raise IndexError("store is empty")
+        pos = (self.total - 1) % self.capacity
+        return tuple(self._cols[name][pos].tolist() for name in self.names)
+
+    def read_since(self, index, limit=None, copy=False):
+        # Rows already evicted from memory are served from the spill file
+        # when there is one; otherwise the reader skips ahead to `first`.
+        # With copy=True the rows are copied out of the ring and the read is
+        # retried if the writer overwrote any of them meanwhile.
+        while True:
+            total = self.total
+            first = total - min(total, self.capacity)
+            if index < first:
+                if index < self.spilled:
+                    stop = self.spilled if limit is None else min(self.spilled, index + limit)
+                    rows = self.spilled_rows()[index:stop]
+                    return index, {name: rows[name] for name in self.names}
+                index = first
+            size = total - index if limit is None else min(total - index, limit)
+            start = index % self.capacity
+            block = {name: self._cols[name][start:start + size] for name in self.names}
+            if not copy:
+                return index, block
+            block = {name: values.copy() for name, values in block.items()}
+            if index >= self.claimed - self.capacity:
+                return index, block
+
+    def spilled_rows(self):
+        if not self.spilled:
+            return np.zeros(0, self.dtype)
+        if self._spill is not None:
+            self._spill.flush()
+        return np.memmap(self.spill_path, dtype=self.dtype, mode="r",
+                         shape=(self.spilled,))
+
+    def history(self, chunk_rows=1_000_000):
+        spilled = self.spilled_rows()
+        for start in range(0, len(spilled), chunk_rows):
+            chunk = spilled[start:start + chunk_rows]
+            yield {name: chunk[name] for name in self.names}
+        if len(self):
+            yield self.columns()
+
+    def query_blocks(self, start=None, end=None):
+        # Zero-copy blocks of the rows in [start, end] (epoch ns): at most
+        # one from the spill file and one from the ring, each found by
+        # binary search, so the cost does not grow with the row count.
+        # Timestamps are expected to be non-decreasing.
+        spilled = self.spilled_rows()
+        if len(spilled):
+            rows = spilled[time_slice(spilled["timestamp"], start, end)]
+            if len(rows):
+                yield {name: rows[name] for name in self.names}
+        if len(self):
+            block = self.columns()
+            rows = time_slice(block["timestamp"], start, end)
+            if rows.stop > rows.start:
+                yield {name: values[rows] for name, values in block.items()}
+
+    def query(self, start=None, end=None):
+        # One block; still zero-copy unless the range spans the spill file
+        # and the ring.
+        parts = list(self.query_blocks(start, end))
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return {name: np.zeros((0,) + self.dtype[name].shape, self.dtype[name].base)
+                    for name in self.names}
+        return {name: np.concatenate([part[name] for part in parts]) for name in self.names}
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def _spill_rows(self, pos, count):
+        self._spill_block({name: self._cols[name][pos:pos + count]
+                           for name in self.names})
+
+    def _spill_block(self, columns):
+        rows = np.empty(len(columns[self.names[0]]), self.dtype)
+        for name in self.names:
+            rows[name] = columns[name]
+        rows.tofile(self._spill)
+        self.spilled += len(rows)
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from SensorLogger.binlog import BinaryLog, BinaryLogWriter, BLOCK_HEADER
+from SensorLogger.schema import ChannelSchema, default_schema
+
+
+def block(start, stop, channels=3):
+    index = np.arange(start, stop, dtype=np.int64)
+    return {"timestamp": index * 1_000,
+            "monotonic": index,
+            "values": index[:, None] + np.arange(channels) / 10,
+            "status": (index % 5).astype(np.uint8),
+            "faults": (index % 3).astype(np.uint8)}
+
+
+def assert_rows(log, start, stop):
+    rows = log.range()
+    expected = block(start, stop)
+    for name, values in expected.items():
+        np.testing.assert_array_equal(rows[name], values, err_msg=name)
+
+
+def write(path, parts, block_rows=100, close=True):
+    writer = BinaryLogWriter(str(path), default_schema(), block_rows)
+    for start, stop in parts:
+        writer.write(block(start, stop))
+    writer.flush()
+    if close:
+        writer.close()
+    return writer
+
+
+def test_closed_log_reads_back_with_index(tmp_path):
+    path = tmp_path / "run.slog"
+    write(path, [(0, 30), (30, 250), (250, 251)])
+    log = BinaryLog(str(path))
+    assert len(log) == 251
+    assert log.index["count"].tolist() == [100, 100, 51]
+    assert log.meta["names"] == list(default_schema().names)
+    assert log.verify() == []
+    assert_rows(log, 0, 251)
+    rows = log.range(120_000, 140_000)
+    np.testing.assert_array_equal(rows["monotonic"], np.arange(120, 141))
+
+
+def test_reopened_log_carries_on_after_close(tmp_path):
+    path = tmp_path / "run.slog"
+    write(path, [(0, 150)])
+    write(path, [(150, 160), (160, 420)])
+    log = BinaryLog(str(path))
+    assert log.index["count"].tolist() == [100, 100, 100, 100, 20]
+    assert log.verify() == []
+    assert_rows(log, 0, 420)
+
+
+def test_unclosed_log_is_readable_and_resumable(tmp_path):
+    # A writer that dies leaves no index; readers fall back on the block
+    # headers and a new writer picks up where the records end.
+    path = tmp_path / "run.slog"
+    writer = write(path, [(0, 130)], close=False)
+    writer._file.close()
+    log = BinaryLog(str(path))
+    assert len(log) == 130
+    assert_rows(log, 0, 130)
+    log.close()
+
+    write(path, [(130, 310)])
+    log = BinaryLog(str(path))
+    assert log.verify() == []
+    assert_rows(log, 0, 310)
+
+
+def test_torn_tail_is_cut_to_whole_records(tmp_path):
+    path = tmp_path / "run.slog"
+    writer = write(path, [(0, 150)], close=False)
+    writer._file.close()
+    # Half of the last record never reached the disk.
+    size = path.stat().st_size
+    with open(path, "r+b") as f:
+        f.truncate(size - writer.record.itemsize // 2)
+    log = BinaryLog(str(path))
+    assert len(log) == 149
+    np.testing.assert_array_equal(log.range()["monotonic"], np.arange(149))
+
+
+def test_corrupt_block_is_reported(tmp_path):
+    path = tmp_path / "run.slog"
+    writer = write(path, [(0, 250)])
+    offset = writer.header_size + writer.block_bytes + BLOCK_HEADER.itemsize + 8
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        f.write(b"\xff" * 8)
+    assert BinaryLog(str(path)).verify() == [1]
+
+
+def test_reopen_rejects_another_channel_count(tmp_path):
+    path = tmp_path / "run.slog"
+    write(path, [(0, 10)])
+    with pytest.raises(ValueError):
+        BinaryLogWriter(str(path), ChannelSchema(default_schema().channels[:2]))
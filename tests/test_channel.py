@@ -0,0 +1,83 @@
+import time
+from threading import Thread
+import numpy as np
+import pytest
+from SensorLogger.channel import SampleChannel
+
+
+def batches(sizes):
+    at = 0
+    for n in sizes:
+        yield {"timestamp": np.arange(at, at + n, dtype=np.int64)}
+        at += n
+
+
+def stamps(items):
+    return np.concatenate([block["timestamp"] for _, block in items])
+
+
+def test_drop_oldest_keeps_the_newest_batches_and_counts_the_gap():
+    channel = SampleChannel(capacity=3, policy="drop_oldest")
+    sizes = [2, 5, 1, 4, 3, 6]
+    for block in batches(sizes):
+        assert channel.put(block)
+    items = channel.drain()
+    assert [seq for seq, _ in items] == [8, 12, 15]
+    np.testing.assert_array_equal(stamps(items), np.arange(8, 21))
+    assert channel.dropped == channel.missed == 8
+    assert channel.received + channel.dropped == channel.sent == sum(sizes)
+
+    # A later drain only counts what was lost since the last one.
+    for block in batches([3, 3]):
+        channel.put({"timestamp": block["timestamp"] + 21})
+    channel.drain()
+    assert channel.missed == 8 and channel.received == 19
+
+
+def test_coalesce_merges_into_the_newest_batch():
+    channel = SampleChannel(capacity=2, policy="coalesce")
+    for block in batches([2, 3, 4, 1, 5]):
+        channel.put(block)
+    assert len(channel) == 2
+    items = channel.drain()
+    assert [seq for seq, _ in items] == [0, 2]
+    np.testing.assert_array_equal(stamps(items), np.arange(15))
+    assert channel.coalesced == 3
+    assert channel.dropped == channel.missed == 0
+    assert channel.received == channel.sent == 15
+
+
+def test_block_waits_for_the_consumer():
+    channel = SampleChannel(capacity=1, policy="block")
+    blocks = list(batches([4, 4, 4]))
+    channel.put(blocks[0])
+    producer = Thread(target=lambda: [channel.put(block) for block in blocks[1:]])
+    producer.start()
+    received = []
+    deadline = time.monotonic() + 5
+    while len(received) < 3 and time.monotonic() < deadline:
+        received.extend(channel.drain())
+        time.sleep(0.01)
+    producer.join()
+    np.testing.assert_array_equal(stamps(received), np.arange(12))
+    assert channel.max_depth == 1 and channel.missed == 0
+
+
+def test_block_timeout_drops_the_batch():
+    channel = SampleChannel(capacity=1, policy="block")
+    first, second, third = batches([2, 3, 4])
+    channel.put(first)
+    assert not channel.put(second, timeout=0.01)
+    assert channel.dropped == 3
+    channel.drain()
+    channel.put(third)
+    channel.drain()
+    assert channel.missed == 3
+    assert channel.received + channel.dropped == channel.sent
+
+
+def test_rejects_bad_settings():
+    with pytest.raises(ValueError):
+        SampleChannel(capacity=0)
+    with pytest.raises(ValueError):
+        SampleChannel(policy="latest")
@@ -0,0 +1,32 @@
+import asyncio
+import time
+from SensorLogger.engine import Engine, EngineThread, SimulatorSource
+from SensorLogger.simulator import SensorSimulator
+
+
+def simulator(tmp_path, rate_hz=1_000):
+    return SensorSimulator(sinks=[], seed=0, rate_hz=rate_hz, report_dir=str(tmp_path),
+                           fault_log=None)
+
+
+def test_engine_without_sources_returns(tmp_path):
+    asyncio.run(Engine(simulator(tmp_path), []).run())
+
+
+def test_paused_simulator_source_does_not_catch_up(tmp_path):
+    sim = simulator(tmp_path)
+    thread = EngineThread(Engine(sim, [SimulatorSource(sim)]))
+    thread.start()
+    time.sleep(0.2)
+    sim.paused = True
+    time.sleep(0.1)
+    before = sim.data.total
+    time.sleep(0.5)
+    assert sim.data.total == before
+    sim.paused = False
+    time.sleep(0.2)
+    thread.stop()
+    thread.join()
+    assert thread.error is None
+    # About 0.4 s of acquisition; catching up the pause would add 500 more rows.
+    assert sim.data.total < 0.75 * 1_000
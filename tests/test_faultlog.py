@@ -0,0 +1,61 @@
+import os
+import pytest
+from SensorLogger.faultlog import FaultLog, make_fault_log, read_fault_log
+from SensorLogger.sinks import HAS_ARROW
+
+START = 1_700_000_000_000_000_000
+COMPRESSIONS = [None, "gzip",
+                pytest.param("zstd", marks=pytest.mark.skipif(not HAS_ARROW,
+                                                              reason="pyarrow is not installed"))]
+
+
+def entries(start, n):
+    # Microsecond stamps, as the JSON Lines log stores them, and both kinds of issue.
+    return [(START + (start + i) * 1_000_000, f"Sensor {i % 3}",
+             "No Data" if i % 4 == 0 else 20.0 + i / 8) for i in range(n)]
+
+
+def read_all(log):
+    rows = []
+    for segment in log.segments + [log.path]:
+        rows.extend(read_fault_log(segment))
+    return rows
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+@pytest.mark.parametrize("fmt", ["jsonl", "flog"])
+def test_rotated_segments_read_back_in_order(tmp_path, fmt, compression):
+    log = make_fault_log(str(tmp_path / "faults"), fmt, max_bytes=4_000, compression=compression)
+    written = []
+    for at in range(0, 1_000, 100):
+        batch = entries(at, 100)
+        log.write(batch)
+        log.flush()
+        written.extend(batch)
+    log.close()
+    assert len(log.segments) > 3
+    suffix = {None: "." + fmt, "gzip": ".gz", "zstd": ".zst"}[compression]
+    assert all(segment.endswith(suffix) and os.path.exists(segment) for segment in log.segments)
+    # Compressed segments replace their uncompressed originals.
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        os.path.basename(path) for path in log.segments + [log.path])
+    assert read_all(log) == written
+    assert log.written == len(written)
+
+
+def test_a_new_run_retires_the_previous_log(tmp_path):
+    path = str(tmp_path / "faults.jsonl")
+    first = FaultLog(path)
+    first.write(entries(0, 10))
+    first.close()
+    second = FaultLog(path)
+    second.write(entries(10, 5))
+    second.close()
+    assert len(second.segments) == 1
+    assert read_fault_log(second.segments[0]) == entries(0, 10)
+    assert read_fault_log(path) == entries(10, 5)
+
+
+def test_rejects_unknown_extensions(tmp_path):
+    with pytest.raises(ValueError):
+        FaultLog(str(tmp_path / "faults.txt"))
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+from SensorLogger.rules import RuleSet, RATE, STUCK
+from SensorLogger.schema import ChannelSchema
+from SensorLogger.storage import STATUS_CODES
+
+SPEC = {
+    "groups": {"flow": {"tolerance": 1.0}},
+    "channels": [
+        {"name": "walk", "max_rate": 40.0, "stuck": 3, "dropout": 0.2,
+         "model": {"type": "random_walk", "start": 0.0, "step": 1.0}},
+        {"name": "flat", "stuck": 4, "dropout": 0.1,
+         "model": {"type": "uniform", "low": 0.0, "high": 2.0}},
+        {"name": "flow1", "group": "flow", "limits": [0, 1], "max_rate": 15.0,
+         "model": {"type": "uniform", "low": 0.0, "high": 1.2}},
+        {"name": "flow2", "group": "flow", "dropout": 0.3, "missing_status": "TEMP SENSOR FAIL",
+         "model": {"type": "uniform", "low": 0.0, "high": 1.2}},
+    ],
+}
+
+
+def recording(n=5_000, seed=0):
+    # Whole-number readings, so runs of repeats are common.
+    schema = ChannelSchema.from_dict(dict(SPEC, decimals=0))
+    values = schema.generate(np.random.default_rng(seed), n)
+    # Uneven intervals, with repeated timestamps now and then.
+    steps = np.random.default_rng(seed + 1).choice([0, 10, 50, 100], n, p=[0.05, 0.3, 0.4, 0.25])
+    timestamps = np.cumsum(steps).astype(np.int64) * 1_000_000
+    return schema, timestamps, values
+
+
+def evaluate(schema, timestamps, values, sizes):
+    rules = RuleSet(schema)
+    parts, at = [], 0
+    for size in sizes:
+        parts.append(rules.evaluate(timestamps[at:at + size], values[at:at + size]))
+        at += size
+    masks = {name: np.concatenate([p[0][name] for p in parts]) for name in parts[0][0]}
+    return (masks, np.concatenate([p[1] for p in parts]), np.concatenate([p[2] for p in parts]))
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_results_do_not_depend_on_batch_boundaries(seed):
+    schema, timestamps, values = recording(seed=seed)
+    whole = evaluate(schema, timestamps, values, [len(timestamps)])
+    sizes = np.random.default_rng(seed).integers(1, 40, len(timestamps))
+    sizes = sizes[np.cumsum(sizes) <= len(timestamps)].tolist()
+    sizes.append(len(timestamps) - sum(sizes))
+    split = evaluate(schema, timestamps, values, sizes)
+    for name in whole[0]:
+        np.testing.assert_array_equal(whole[0][name], split[0][name], err_msg=name)
+    np.testing.assert_array_equal(whole[1], split[1])
+    np.testing.assert_array_equal(whole[2], split[2])
+    assert whole[0]["rate"].any() and whole[0]["stuck"].any()
+
+
+def test_history_rules_match_a_reference_loop():
+    schema, timestamps, values = recording(2_000)
+    masks, faults, _ = evaluate(schema, timestamps, values, [2_000])
+    for i, ch in enumerate(schema.channels):
+        last = last_time = None
+        run = 0
+        for row in range(len(values)):
+            value, t = values[row, i], timestamps[row]
+            if np.isnan(value):
+                assert not masks["rate"][row, i] and not masks["stuck"][row, i]
+                continue
+            rate = stuck = False
+            if last is not None:
+                run = run + 1 if value == last else 0
+                elapsed = (t - last_time) / 1e9
+                rate = (ch.max_rate is not None and elapsed > 0
+                        and abs(value - last) > ch.max_rate * elapsed)
+                stuck = ch.stuck is not None and run >= ch.stuck - 1
+            assert masks["rate"][row, i] == rate, (ch.name, row)
+            assert masks["stuck"][row, i] == stuck, (ch.name, row)
+            last, last_time = value, t
+    assert ((faults & RATE) != 0).tolist() == masks["rate"].any(axis=1).tolist()
+    assert ((faults & STUCK) != 0).tolist() == masks["stuck"].any(axis=1).tolist()
+
+
+def test_repeated_timestamps_are_not_rate_faults():
+    schema = ChannelSchema.from_dict({"channels": [{"name": "p", "max_rate": 1.0}]})
+    rules = RuleSet(schema)
+    masks, _, _ = rules.evaluate(np.zeros(3, dtype=np.int64),
+                                 np.array([[0.0], [5.0], [9.0]]))
+    assert not masks["rate"].any()
+    masks, _, _ = rules.evaluate(np.array([1_000_000_000], dtype=np.int64), np.array([[20.0]]))
+    assert masks["rate"].all()
+
+
+def test_statuses_follow_channel_and_group_settings():
+    schema = ChannelSchema.from_dict({
+        "groups": {"flow": {"status": "TEMP SENSOR MISMATCH"}},
+        "channels": [
+            {"name": "a", "missing_status": "TEMP SENSOR FAIL"},
+            {"name": "b", "group": "flow"},
+            {"name": "c", "group": "flow", "limits": [0, 1], "limit_status": "PRESSURE FAULT"},
+        ]})
+    values = np.array([
+        [np.nan, 0.5, 0.5],   # a missing
+        [0.5, np.nan, 0.5],   # b missing: generic status
+        [0.5, 0.0, 0.9],      # within tolerance
+        [0.5, 0.0, 5.0],      # c out of limits and spread
+        [0.5, -4.0, 0.0],     # spread only
+    ])
+    _, _, status = RuleSet(schema).evaluate(np.arange(5, dtype=np.int64), values)
+    assert status.tolist() == [STATUS_CODES[label] for label in (
+        "TEMP SENSOR FAIL", "SENSOR FAIL", "OK", "PRESSURE FAULT", "TEMP SENSOR MISMATCH")]
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from SensorLogger import scheduler as scheduler_module
+from SensorLogger.scheduler import RateScheduler
+
+EPOCH_NS = 1_700_000_000_000_000_000
+
+
+class FakeClock:
+    # Stands in for the time module; sleep() advances the clock exactly.
+    def __init__(self):
+        self.now = 0
+
+    def monotonic_ns(self):
+        return self.now
+
+    def time_ns(self):
+        return EPOCH_NS + self.now
+
+    def sleep(self, seconds):
+        self.now += round(seconds * 1e9)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(scheduler_module, "time", clock)
+    return clock
+
+
+def run(scheduler, batches):
+    return [scheduler.wait() for _ in range(batches)]
+
+
+def test_steady_batches_are_one_period_apart(clock):
+    scheduler = RateScheduler(1_000)
+    stamps = np.concatenate(run(scheduler, 50))
+    assert scheduler.batch_size == 10
+    np.testing.assert_array_equal(np.diff(stamps), 1_000_000)
+    assert stamps[0] == EPOCH_NS
+    assert scheduler.overruns == 0
+    assert scheduler.achieved_rate() == pytest.approx(1_000)
+
+
+def test_catch_up_emits_every_missed_sample(clock):
+    scheduler = RateScheduler(1_000, "catch_up")
+    run(scheduler, 10)
+    clock.sleep(0.5)
+    batches = run(scheduler, 20)
+    # Catch-up batches are capped at max_batch until the schedule is met.
+    assert max(len(batch) for batch in batches) == scheduler.max_batch
+    stamps = np.concatenate(batches)
+    np.testing.assert_array_equal(np.diff(stamps), 1_000_000)
+    assert scheduler.skipped == 0 and scheduler.overruns > 0
+    assert scheduler.samples == 100 + sum(len(batch) for batch in batches)
+    assert scheduler.achieved_rate() == pytest.approx(1_000)
+
+
+def test_skip_drops_missed_samples_and_reports_the_emitted_rate(clock):
+    scheduler = RateScheduler(1_000, "skip")
+    run(scheduler, 10)
+    clock.sleep(0.5)
+    batch = scheduler.take()
+    assert len(batch) == scheduler.batch_size
+    assert batch[0] - EPOCH_NS >= 500_000_000
+    assert scheduler.skipped == 490
+    run(scheduler, 10)
+    emitted = scheduler.samples
+    assert emitted == 210
+    # 210 samples over the 0.7 s the schedule has covered, not the 700 it indexed.
+    assert scheduler.achieved_rate() == pytest.approx(emitted / 0.7)
+    assert scheduler.stats()["achieved_hz"] == pytest.approx(300)
+
+
+def test_reset_re_anchors_the_schedule(clock):
+    scheduler = RateScheduler(100)
+    run(scheduler, 3)
+    clock.sleep(10)
+    scheduler.reset()
+    batch = scheduler.wait()
+    assert len(batch) == 1 and batch[0] == EPOCH_NS + clock.now
+    assert scheduler.overruns == 0
@@ -0,0 +1,95 @@
+import multiprocessing
+import os
+import time
+import uuid
+import numpy as np
+import pytest
+from SensorLogger.sharedstore import SharedColumnStore, _CLAIMED, _SEQ
+
+COLUMNS = [("timestamp", np.int64), ("values", np.float64, (4,))]
+CAPACITY = 64
+
+
+def block(start, stop):
+    # Every value of a row derives from its timestamp, so a torn row (one
+    # mixing two writes) is detectable.
+    index = np.arange(start, stop, dtype=np.int64)
+    return {"timestamp": index,
+            "values": index[:, None] * 1.0 + np.arange(4)}
+
+
+@pytest.fixture
+def ring_name():
+    name = f"sltest-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    yield name
+    try:
+        SharedColumnStore.attach(name, COLUMNS).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def test_restarted_writer_adopts_the_ring(ring_name):
+    writer = SharedColumnStore.create(ring_name, COLUMNS, CAPACITY)
+    writer.extend(block(0, 100))
+    generation = writer.generation
+    # Die mid-write: rows claimed and the sequence number left odd.
+    writer._header[_CLAIMED] = 120
+    writer._header[_SEQ] += 1
+    writer.close()
+
+    reader = SharedColumnStore.attach(ring_name, COLUMNS)
+    writer = SharedColumnStore.create(ring_name, COLUMNS, CAPACITY)
+    assert writer.total == 100
+    assert writer.claimed == 100
+    assert writer.seq % 2 == 0
+    assert writer.generation == generation + 1
+    writer.extend(block(100, 110))
+    start, rows = reader.read_since(90, copy=True)
+    assert start == 90
+    np.testing.assert_array_equal(rows["timestamp"], np.arange(90, 110))
+    with pytest.raises(ValueError):
+        reader["values"][:] = 0
+    reader.close()
+    writer.close()
+
+
+def test_create_rejects_a_ring_of_another_size(ring_name):
+    SharedColumnStore.create(ring_name, COLUMNS, CAPACITY).close()
+    with pytest.raises(ValueError):
+        SharedColumnStore.create(ring_name, COLUMNS, CAPACITY * 2)
+
+
+def _write(name, total, batch):
+    ring = SharedColumnStore.create(name, COLUMNS, CAPACITY)
+    for at in range(0, total, batch):
+        ring.extend(block(at, min(at + batch, total)))
+    ring.close()
+
+
+def test_reader_in_another_process_never_sees_torn_rows(ring_name):
+    # Rows are read while another process overwrites the ring as fast as
+    # it can; every row delivered must be whole, and every row not
+    # delivered must be accounted for as skipped.
+    total = 200_000
+    SharedColumnStore.create(ring_name, COLUMNS, CAPACITY).close()
+    reader = SharedColumnStore.attach(ring_name, COLUMNS)
+    writer = multiprocessing.get_context("spawn").Process(
+        target=_write, args=(ring_name, total, 7))
+    writer.start()
+    cursor = delivered = lost = 0
+    while cursor < total and (writer.is_alive() or reader.total > cursor):
+        if reader.total <= cursor:
+            time.sleep(0)
+            continue
+        start, rows = reader.read_since(cursor, 16, copy=True)
+        lost += start - cursor
+        count = len(rows["timestamp"])
+        np.testing.assert_array_equal(rows["timestamp"], np.arange(start, start + count))
+        np.testing.assert_array_equal(rows["values"],
+                                      rows["timestamp"][:, None] * 1.0 + np.arange(4))
+        cursor = start + count
+        delivered += count
+    writer.join()
+    assert writer.exitcode == 0
+    assert delivered + lost == total
+    reader.close()
@@ -0,0 +1,14 @@
+import time
+import numpy as np
+from SensorLogger.simulator import SensorSimulator
+
+
+def test_default_stamps_stay_near_the_clock(tmp_path):
+    sim = SensorSimulator(sinks=[], seed=0, report_dir=str(tmp_path), fault_log=None)
+    for _ in range(3):
+        sim.generate_batch(500_000)
+    stamps = sim.data["timestamp"]
+    assert (np.diff(stamps) > 0).all()
+    assert stamps[-1] - time.time_ns() < 10_000_000_000
+    block = sim.generate_batch(10, period_ns=1_000_000)
+    np.testing.assert_array_equal(np.diff(block["timestamp"]), 1_000_000)
@@ -0,0 +1,116 @@
+import os
+import sqlite3
+from contextlib import closing
+import numpy as np
+import pytest
+from SensorLogger.simulator import SensorSimulator
+from SensorLogger.sinks import HAS_ARROW, make_sink, read_blocks
+
+needs_arrow = pytest.mark.skipif(not HAS_ARROW, reason="pyarrow is not installed")
+START = 1_700_000_000_000_000_000
+
+
+def simulator(tmp_path, seed=0):
+    return SensorSimulator(sinks=[], seed=seed, report_dir=str(tmp_path), fault_log=None)
+
+
+def record(sim, sink, n, chunk_rows=1_000):
+    # Rows 1 ms apart on a round microsecond, so every format keeps them
+    # exactly, archived a chunk at a time as a running logger would.
+    for at in range(sim.data.total, sim.data.total + n, chunk_rows):
+        stamps = START + np.arange(at, at + chunk_rows, dtype=np.int64) * 1_000_000
+        sim.generate_batch(chunk_rows, stamps)
+        sink.flush()
+    sink.close()
+
+
+def read_back(path, schema, chunk_rows=1_000):
+    blocks = list(read_blocks(path, chunk_rows, schema))
+    return {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+
+
+def assert_round_trip(sim, path):
+    rows = read_back(path, sim.schema)
+    for name, values in rows.items():
+        np.testing.assert_array_equal(values, sim.data[name], err_msg=name)
+
+
+def test_csv_round_trip(tmp_path):
+    sim = simulator(tmp_path)
+    sink = make_sink(sim.data, "csv", str(tmp_path / "log"), schema=sim.schema)
+    record(sim, sink, 2_500, chunk_rows=500)
+    assert sink.written == 2_500 and sink.lost == 0
+    assert_round_trip(sim, sink.path)
+
+
+def test_background_sink_never_writes_overwritten_rows(tmp_path):
+    # Rows carry their own index in every column, so a row the writer
+    # overwrote while the sink was copying it would not match.
+    sim = SensorSimulator(sinks=[], capacity=1_000, report_dir=str(tmp_path), fault_log=None)
+    sink = make_sink(sim.data, "csv", str(tmp_path / "log"), schema=sim.schema,
+                     flush_interval=0.001, batch_size=300)
+    sim.sinks = [sink]
+    sink.start()
+    for at in range(0, 200_000, 400):
+        index = np.arange(at, at + 400, dtype=np.int64)
+        sim.process(START + index * 1_000_000, np.repeat(index[:, None] % 1_000, 3, axis=1) + 0.0)
+    sink.close()
+    assert sink.written + sink.lost == sim.data.total
+    rows = read_back(sink.path, sim.schema)
+    index = (rows["timestamp"] - START) // 1_000_000
+    assert (np.diff(index) > 0).all()
+    np.testing.assert_array_equal(rows["values"], np.repeat(index[:, None] % 1_000, 3, axis=1))
+
+
+def test_sqlite_round_trip(tmp_path):
+    sim = simulator(tmp_path)
+    sink = make_sink(sim.data, "sqlite", str(tmp_path / "log"), schema=sim.schema)
+    sim.sinks = [sink]
+    record(sim, sink, 2_500, chunk_rows=500)
+    assert_round_trip(sim, sink.path)
+    with closing(sqlite3.connect(sink.path)) as conn:
+        (faults,), = conn.execute("SELECT count(*) FROM faults")
+    assert faults == sink.faults_written == sim.faults.total > 0
+    # A time range is answered from the timestamp index.
+    start, end = sim.data["timestamp"][[700, 1_799]].tolist()
+    rows = list(read_blocks(sink.path, 1_000, sim.schema, start, end))
+    np.testing.assert_array_equal(np.concatenate([block["timestamp"] for block in rows]),
+                                  sim.data["timestamp"][700:1_800])
+
+
+@needs_arrow
+def test_parquet_round_trip(tmp_path):
+    sim = simulator(tmp_path)
+    sink = make_sink(sim.data, "parquet", str(tmp_path / "log"), schema=sim.schema,
+                     row_group_size=1_000, part_rows=3_000)
+    record(sim, sink, 5_000)
+    assert sink.parts == 2
+    assert sorted(os.listdir(sink.path)) == ["part-00000.parquet", "part-00001.parquet"]
+    assert_round_trip(sim, sink.path)
+
+
+@needs_arrow
+def test_flushes_buffer_whole_row_groups(tmp_path):
+    import pyarrow.parquet as pq
+    sim = simulator(tmp_path)
+    sink = make_sink(sim.data, "parquet", str(tmp_path / "log"), schema=sim.schema,
+                     row_group_size=1_000)
+    record(sim, sink, 2_500, chunk_rows=100)
+    part = pq.ParquetFile(os.path.join(sink.path, "part-00000.parquet"))
+    sizes = [part.metadata.row_group(i).num_rows for i in range(part.num_row_groups)]
+    assert sizes == [1_000, 1_000, 500]
+
+
+@needs_arrow
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_new_run_replaces_earlier_parts(tmp_path, fmt):
+    base = str(tmp_path / "log")
+    first = simulator(tmp_path)
+    sink = make_sink(first.data, fmt, base, schema=first.schema, part_rows=1_000)
+    record(first, sink, 3_000, chunk_rows=500)
+    assert sink.parts == 3
+    second = simulator(tmp_path, seed=1)
+    sink = make_sink(second.data, fmt, base, schema=second.schema, part_rows=1_000)
+    record(second, sink, 1_500, chunk_rows=500)
+    assert len(os.listdir(sink.path)) == sink.parts == 2
+    assert_round_trip(second, sink.path)
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+from SensorLogger.stats import OnlineStats, RollingStats
+
+NAMES = ("a", "b", "c")
+
+
+def readings(seed, rows=5_000):
+    # Offset random walks with dropouts, so the sums are badly conditioned
+    # and some blocks have no valid reading in a column.
+    rng = np.random.default_rng(seed)
+    values = 1e6 + rng.normal(size=(rows, len(NAMES))).cumsum(axis=0)
+    values[rng.random(values.shape) < 0.1] = np.nan
+    values[100:400, 1] = np.nan
+    return values
+
+
+def blocks(values, seed):
+    rng = np.random.default_rng(seed)
+    cuts = np.sort(rng.choice(np.arange(1, len(values)), size=40, replace=False))
+    return np.split(values, cuts)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_online_stats_match_a_full_pass(seed):
+    values = readings(seed)
+    stats = OnlineStats(NAMES)
+    seen = 0
+    for block in blocks(values, seed):
+        stats.update_array(block)
+        seen += len(block)
+        so_far = values[:seen]
+        np.testing.assert_array_equal(stats.count, (~np.isnan(so_far)).sum(axis=0))
+        np.testing.assert_allclose(stats.mean, np.nanmean(so_far, axis=0), rtol=1e-12)
+        np.testing.assert_allclose(stats.std(), np.nanstd(so_far, axis=0, ddof=1), rtol=1e-7)
+        np.testing.assert_array_equal(stats.min, np.nanmin(so_far, axis=0))
+        np.testing.assert_array_equal(stats.max, np.nanmax(so_far, axis=0))
+    assert stats.rows == len(values)
+
+
+def test_merged_stats_match_one_pass():
+    values = readings(3)
+    whole, left, right = OnlineStats(NAMES), OnlineStats(NAMES), OnlineStats(NAMES)
+    whole.update_array(values)
+    left.update_array(values[:1_234])
+    right.update_array(values[1_234:])
+    left.merge(right)
+    assert left.rows == whole.rows
+    np.testing.assert_array_equal(left.count, whole.count)
+    np.testing.assert_allclose(left.mean, whole.mean, rtol=1e-12)
+    np.testing.assert_allclose(left.std(), whole.std(), rtol=1e-9)
+    np.testing.assert_array_equal(left.min, whole.min)
+    np.testing.assert_array_equal(left.max, whole.max)
+
+
+def test_p2_quantiles_track_the_exact_quantiles():
+    rng = np.random.default_rng(4)
+    values = rng.normal(size=(20_000, 1))
+    stats = OnlineStats(["x"], quantiles=(0.05, 0.5, 0.95))
+    for block in np.array_split(values, 7):
+        stats.update_array(block)
+    summary = stats.summary("x")
+    for p in stats.quantiles:
+        assert summary[f"p{p * 100:g}"] == pytest.approx(np.quantile(values, p), abs=0.03)
+    with pytest.raises(ValueError):
+        stats.merge(OnlineStats(["x"]))
+
+
+def reference_window(values, timestamps, window, alpha):
+    # Statistics of the last `window` samples recomputed from scratch; the
+    # EWMA is the plain recurrence over every valid reading.
+    recent, stamps = values[-window:], timestamps[-window:]
+    x = np.arange(len(recent), dtype=np.float64)
+    mean, std, slope = [], [], []
+    for column in recent.T:
+        valid = ~np.isnan(column)
+        mean.append(column[valid].mean() if valid.any() else np.nan)
+        std.append(column[valid].std(ddof=1) if valid.sum() > 1 else np.nan)
+        slope.append(np.polyfit(x[valid], column[valid], 1)[0] if valid.sum() > 1 else np.nan)
+    ewma = []
+    for column in values.T:
+        e = np.nan
+        for y in column[~np.isnan(column)].tolist():
+            e = y if np.isnan(e) else alpha * y + (1 - alpha) * e
+        ewma.append(e)
+    period = (stamps[-1] - stamps[0]) / 1e9 / (len(stamps) - 1) if len(stamps) > 1 else np.nan
+    return np.array(mean), np.array(std), np.array(slope), np.array(ewma), period
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_rolling_stats_match_a_recomputed_window(seed):
+    window = 200
+    values = readings(seed, rows=3_000)
+    timestamps = 1_700_000_000_000_000_000 + np.arange(len(values), dtype=np.int64) * 1_000_000
+    rolling = RollingStats(NAMES, window, rebuild_every=3)
+    seen = 0
+    for block in blocks(values, seed):
+        rolling.update(timestamps[seen:seen + len(block)], block)
+        seen += len(block)
+        mean, std, slope, ewma, period = reference_window(
+            values[:seen], timestamps[:seen], window, rolling.alpha)
+        np.testing.assert_allclose(rolling.mean(), mean, rtol=0, atol=1e-6)
+        np.testing.assert_allclose(rolling.std(), std, rtol=1e-6)
+        np.testing.assert_allclose(rolling.slope(), slope, rtol=1e-6, atol=1e-9)
+        np.testing.assert_allclose(rolling.ewma, ewma, rtol=0, atol=1e-6)
+        assert rolling.period() == pytest.approx(period)
+        np.testing.assert_array_equal(rolling.count(),
+                                      (~np.isnan(values[:seen][-window:])).sum(axis=0))
+
+
+def test_trend_follows_the_fitted_slope():
+    window = 100
+    x = np.arange(window, dtype=np.float64)
+    timestamps = np.arange(window, dtype=np.int64) * 1_000_000_000
+    noise = np.random.default_rng(5).normal(scale=0.01, size=window)
+    rolling = RollingStats(NAMES, window)
+    rolling.update(timestamps, np.column_stack([0.1 * x + noise, -0.1 * x + noise, noise]))
+    assert rolling.trend() == ["Rising", "Falling", "Stable"]
+    np.testing.assert_allclose(rolling.rate(), [0.1, -0.1, 0.0], atol=1e-3)
@@ -0,0 +1,95 @@
+import numpy as np
+from SensorLogger.storage import ColumnStore
+
+COLUMNS = [("timestamp", np.int64), ("value", np.float64)]
+
+
+def rows(start, stop):
+    index = np.arange(start, stop, dtype=np.int64)
+    return {"timestamp": index, "value": index * 0.5}
+
+
+def test_ring_wrap_keeps_newest_rows_contiguous():
+    store = ColumnStore(COLUMNS, capacity=10)
+    at = 0
+    for n in (3, 7, 4, 9, 1, 25, 2):
+        store.extend(rows(at, at + n))
+        at += n
+        assert store.total == at
+        assert len(store) == min(at, 10)
+        assert store.first == at - len(store)
+        view = store["timestamp"]
+        assert view.base is not None
+        np.testing.assert_array_equal(view, np.arange(store.first, at))
+        np.testing.assert_array_equal(store["value"], view * 0.5)
+        assert store.last() == (at - 1, (at - 1) * 0.5)
+
+
+def test_append_wraps_like_extend():
+    store = ColumnStore(COLUMNS, capacity=4)
+    for i in range(11):
+        store.append(i, i * 0.5)
+    np.testing.assert_array_equal(store["timestamp"], [7, 8, 9, 10])
+    np.testing.assert_array_equal(store.view("timestamp", 2), [9, 10])
+
+
+def test_spill_holds_every_evicted_row(tmp_path):
+    store = ColumnStore(COLUMNS, capacity=8, spill_path=str(tmp_path / "spill.bin"))
+    at = 0
+    for n in (5, 6, 30, 1, 8):
+        store.extend(rows(at, at + n))
+        at += n
+    store.append(at, at * 0.5)
+    at += 1
+    assert store.spilled == store.first == at - 8
+    np.testing.assert_array_equal(store.spilled_rows()["timestamp"], np.arange(store.spilled))
+    history = np.concatenate([block["timestamp"] for block in store.history(chunk_rows=7)])
+    np.testing.assert_array_equal(history, np.arange(at))
+
+    # Ranges spanning the spill file and the ring are joined.
+    block = store.query(10, at - 3)
+    np.testing.assert_array_equal(block["timestamp"], np.arange(10, at - 2))
+    start, block = store.read_since(3, limit=5)
+    assert start == 3
+    np.testing.assert_array_equal(block["timestamp"], np.arange(3, 8))
+    store.close()
+
+
+def test_read_since_skips_rows_lost_without_spill():
+    store = ColumnStore(COLUMNS, capacity=8)
+    store.extend(rows(0, 20))
+    start, block = store.read_since(5, copy=True)
+    assert start == 12
+    np.testing.assert_array_equal(block["timestamp"], np.arange(12, 20))
+
+
+class _Racing(np.ndarray):
+    # A ring column whose next copy() first lets the writer run, as if it
+    # overwrote the rows while a reader was copying them.
+    hook = None
+
+    def copy(self, *args, **kwargs):
+        hook, _Racing.hook = _Racing.hook, None
+        if hook is not None:
+            hook()
+        return np.asarray(self).copy(*args, **kwargs)
+
+
+def test_read_since_retries_rows_overwritten_during_copy():
+    store = ColumnStore(COLUMNS, capacity=8)
+    store.extend(rows(0, 8))
+    store._cols = {name: column.view(_Racing) for name, column in store._cols.items()}
+    _Racing.hook = lambda: store.extend(rows(8, 14))
+    start, block = store.read_since(2, copy=True)
+    # The first copy held rows 2..7, some of them overwritten by 8..13
+    # halfway through; the retry starts from the oldest row still held.
+    assert start == 6
+    np.testing.assert_array_equal(block["timestamp"], np.arange(6, 14))
+    np.testing.assert_array_equal(block["value"], np.arange(6, 14) * 0.5)
+
+
+def test_query_finds_ranges_by_timestamp():
+    store = ColumnStore(COLUMNS, capacity=100)
+    store.extend({"timestamp": np.arange(0, 200, 2, dtype=np.int64), "value": np.zeros(100)})
+    np.testing.assert_array_equal(store.query(11, 20)["timestamp"], [12, 14, 16, 18, 20])
+    assert len(store.query(500)["timestamp"]) == 0
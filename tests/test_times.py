@@ -0,0 +1,62 @@
+import os
+import time
+import numpy as np
+import pytest
+from SensorLogger.sinks import format_time, from_local, parse_time, utc_offsets
+
+DAY = 1_700_000_000_000_000_000
+ZONES = ["America/New_York", "Europe/London", "Australia/Lord_Howe", "Asia/Kolkata", "UTC"]
+
+
+@pytest.fixture(params=ZONES)
+def zone(request):
+    # Switches the process's local zone for one test, as TZ=... would.
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset is not available")
+    saved = os.environ.get("TZ")
+    os.environ["TZ"] = request.param
+    time.tzset()
+    yield request.param
+    if saved is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = saved
+    time.tzset()
+
+
+def strftime(timestamps):
+    return [time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t // 1_000_000_000))
+            for t in timestamps.tolist()]
+
+
+def test_format_time_matches_strftime_across_two_years(zone):
+    # An odd step lands on every hour and many minutes, including the
+    # hours around each DST change in 2023 and 2024.
+    seconds = np.arange(1_672_531_200, 1_735_689_600, 3_607, dtype=np.int64)
+    timestamps = seconds * 1_000_000_000
+    assert format_time(timestamps, date=True).tolist() == strftime(timestamps)
+    # Short runs take the single-offset path unless they straddle a change.
+    for day in range(0, len(timestamps) - 24, 24):
+        run = timestamps[day:day + 24]
+        assert format_time(run, date=True).tolist() == strftime(run)
+
+
+def test_from_local_inverts_the_local_offset(zone):
+    timestamps = np.arange(1_672_531_200, 1_735_689_600, 3_607, dtype=np.int64) * 1_000_000_000
+    local = timestamps + utc_offsets(timestamps)
+    back = from_local(local)
+    # A time repeated when clocks go back may come back as the other instant.
+    np.testing.assert_array_equal(back + utc_offsets(back), local)
+    assert (back == timestamps).mean() > 0.999
+
+
+def test_parse_time_of_day_on_the_recording_day():
+    stamp = parse_time("14:05:30", DAY)
+    assert format_time([stamp], date=True)[0] == format_time([DAY], date=True)[0][:11] + "14:05:30"
+    assert parse_time("14:05", DAY) == parse_time("14:05:00", DAY)
+    assert parse_time(str(DAY)) == DAY
+
+
+def test_parse_time_rejects_bad_text():
+    with pytest.raises(ValueError):
+        parse_time("14:xx", DAY)